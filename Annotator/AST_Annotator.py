@@ -3,6 +3,8 @@ import os
 import sys
 import csv
 from typing import List, Dict
+import ast_cache
+import generate_csv
 
 def infer_type(node):
     """Infers type based on AST nodes."""
@@ -20,29 +22,39 @@ def infer_type(node):
 def analyze_code_for_types(file_path):
     """Analyzes Python file for type hints and returns structured data."""
     try:
-        with open(file_path, 'r') as file:
-            code = file.read()
-    except Exception as e:
+        tree = ast_cache.parse_file(file_path)
+    except OSError as e:
         print(f"Error reading file: {e}")
         return []
 
-    tree = ast.parse(code)
     annotations = []
 
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Assign):
-            for target in node.targets:
-                if isinstance(target, ast.Name):
-                    type_hint = infer_type(node.value)
-                    annotations.append([file_path, target.id, type_hint])
-        elif isinstance(node, ast.FunctionDef):
-            for arg in node.args.args:
-                if not arg.annotation:
-                    annotations.append([file_path, f"{node.name} (arg: {arg.arg})", "Missing Type Hint"])
-            if not node.returns:
-                annotations.append([file_path, f"{node.name} (return)", "Missing Return Type Hint"])
+    for node in walk_in_source_order(tree):
+        annotate_node(file_path, node, annotations)
     return annotations
 
+def walk_in_source_order(tree):
+    """Yields every node depth-first, parents before children, as an ast.NodeVisitor visits them."""
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+def annotate_node(file_path, node, annotations):
+    """Appends the findings for a single AST node to annotations."""
+    if isinstance(node, ast.Assign):
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                type_hint = infer_type(node.value)
+                annotations.append([file_path, target.id, type_hint])
+    elif isinstance(node, ast.FunctionDef):
+        for arg in node.args.args:
+            if not arg.annotation:
+                annotations.append([file_path, f"{node.name} (arg: {arg.arg})", "Missing Type Hint"])
+        if not node.returns:
+            annotations.append([file_path, f"{node.name} (return)", "Missing Return Type Hint"])
+
 def generate_report(file_path, annotations):
     """Generates a structured CSV report."""
     report_file = file_path.replace('.py', '_AST_report.csv')
@@ -51,6 +63,7 @@ def generate_report(file_path, annotations):
             writer = csv.writer(csvfile)
             writer.writerow(["File", "Variable/Function", "Type Hint"])
             writer.writerows(annotations)
+        generate_csv.write_records(generate_csv.records_path(report_file), generate_csv.ast_rows(annotations))
         print(f"Annotation report generated at {report_file}")
     except Exception as e:
         print(f"Error generating report: {e}")
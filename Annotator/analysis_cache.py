@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+DEFAULT_PATH = ".annotation_cache.sqlite"
+
+# Persistent per-file results of the annotators, so a run only re-analyzes what
+# changed. A result is stored with the content hash of every file it was derived
+# from (the analyzed file itself, plus any modules or sessions a run read) and
+# the version of the tool that produced it; it is served again only while all of
+# those still match. File hashes are remembered with each file's (mtime, size),
+# so unchanged files are stat'ed, not re-read.
+class AnalysisCache:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            digest TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS results (
+            tool TEXT NOT NULL,
+            key TEXT NOT NULL,
+            version TEXT NOT NULL,
+            deps TEXT NOT NULL,
+            result TEXT NOT NULL,
+            PRIMARY KEY (tool, key)
+        );
+    """
+    BUSY_TIMEOUT = 30  # seconds to wait for another writer
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=self.BUSY_TIMEOUT, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        self._files = {
+            path: ((mtime_ns, size), digest)
+            for path, mtime_ns, size, digest in self._conn.execute("SELECT path, mtime_ns, size, digest FROM files")
+        }
+        self._digests: dict[str, str] = {}     # digests already checked in this run
+        self._changed_files: dict[str, tuple] = {}
+        self._results: list[tuple] = []
+        self.stats = {"hits": 0, "misses": 0}
+
+    def digest(self, path: str) -> str:
+        """Content hash of path, or None if it no longer exists."""
+        path = os.path.abspath(path)
+        if path in self._digests:
+            return self._digests[path]
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._digests[path] = None
+            return None
+        stat_key = (st.st_mtime_ns, st.st_size)
+        known = self._files.get(path)
+        if known is not None and known[0] == stat_key:
+            digest = known[1]
+        else:
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            self._files[path] = (stat_key, digest)
+            self._changed_files[path] = (path, *stat_key, digest)
+        self._digests[path] = digest
+        return digest
+
+    def get(self, tool: str, key: str, version: str):
+        """The stored result for key if it was made by this version from files that are unchanged, else None."""
+        row = self._conn.execute(
+            "SELECT version, deps, result FROM results WHERE tool = ? AND key = ?", (tool, key)
+        ).fetchone()
+        if row is not None and row[0] == version:
+            deps = json.loads(row[1])
+            if all(self.digest(path) == digest for path, digest in deps.items()):
+                self.stats["hits"] += 1
+                return json.loads(row[2])
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, tool: str, key: str, version: str, deps, result) -> None:
+        """Stores result for key, derived from the files in deps. Written out by save()."""
+        deps = {os.path.abspath(path): self.digest(path) for path in deps}
+        self._results.append((tool, key, version, json.dumps(deps), json.dumps(result)))
+
+    def save(self) -> None:
+        with self._transaction():
+            self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", self._changed_files.values())
+            self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", self._results)
+        self._changed_files.clear()
+        self._results.clear()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+
+def tool_version(*modules) -> str:
+    """Hash of the given modules' source files: a change to the tool invalidates what it produced."""
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def digest_json(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
@@ -0,0 +1,185 @@
+import os
+import sys
+import sysconfig
+import AST_Annotator
+import analysis_cache
+import type_inference
+import conditional_annotator
+import generate_csv
+import righttyper
+import variable_annotator
+
+# Where the standard library and installed packages live, as prefixes of their files
+LIBRARY_PATHS = tuple({
+    os.path.join(os.path.abspath(sysconfig.get_path(name)), "")
+    for name in ("stdlib", "platstdlib", "purelib", "platlib")
+})
+
+class CombinedInferer(variable_annotator.VariableTypeInferer):
+    """VariableTypeInferer that also collects AST_Annotator's findings on the same traversal."""
+
+    def __init__(self):
+        super().__init__()
+        self.ast_annotations = {}      # mapping: filename -> rows as in <file>_AST_report.csv
+
+    def analyze_file(self, filename):
+        self.annotations = self.ast_annotations.setdefault(filename, [])
+        super().analyze_file(filename)
+
+    def visit_Assign(self, node):
+        AST_Annotator.annotate_node(self.filename, node, self.annotations)
+        super().visit_Assign(node)
+
+    def visit_FunctionDef(self, node):
+        AST_Annotator.annotate_node(self.filename, node, self.annotations)
+        super().visit_FunctionDef(node)
+
+
+class AnnotationEngine:
+    """Runs all four annotators in this process and builds the combined report from memory.
+
+    Each file is parsed and walked once for the static annotators; the runtime
+    annotators' results are kept in memory too, so no intermediate report files
+    are needed unless write_intermediates() is called. With an AnalysisCache,
+    results for unchanged files are taken from the cache and only the rest are
+    analyzed again.
+    """
+
+    def __init__(self, paths, cache=None):
+        self.paths = list(paths)
+        self.cache = cache
+        self.variable_types = {}       # mapping: (filename, function or 'global', variable) -> type string
+        self.ast_annotations = {}      # mapping: filename -> rows as in <file>_AST_report.csv
+        self.conditional = {}          # mapping: filename -> {variable: runtime type}
+        self.traced = False
+
+    def cached(self, tool, key, version, analyze):
+        """Result of analyze() for key, from the cache if its inputs are unchanged.
+
+        analyze returns (result, files the result was derived from); results
+        must be JSON-serializable.
+        """
+        if self.cache is None:
+            return analyze()[0]
+        result = self.cache.get(tool, key, version)
+        if result is None:
+            result, deps = analyze()
+            self.cache.put(tool, key, version, deps, result)
+        return result
+
+    def run_static(self):
+        version = analysis_cache.tool_version(sys.modules[__name__], AST_Annotator, variable_annotator)
+
+        def analyze(path, known_returns):
+            # Return types imported from other modules are inputs as much as the file is
+            known_version = f"{version}:{analysis_cache.digest_json(known_returns)}"
+            return self.cached("static", path, known_version, lambda: (static_fragment(path, known_returns), [path]))
+
+        fragments = variable_annotator.analyze_modules(self.paths, analyze, jobs=1)
+        for path, fragment in zip(dict.fromkeys(self.paths), fragments):
+            self.variable_types.update(((f, func, var), vartype) for f, func, var, vartype in fragment["variables"])
+            self.ast_annotations[path] = fragment["ast"]
+
+    def run_runtime(self, sessions=None, jobs=None, backend="auto"):
+        # Trace first: the tracer forgets the modules each run imported, while
+        # conditional_annotator leaves its imports behind, and modules already
+        # imported would not have their top-level code traced.
+        self.run_righttyper(sessions, jobs, backend)
+
+        version = analysis_cache.tool_version(conditional_annotator, type_inference)
+        for path in self.paths:
+            self.conditional[path] = self.cached("conditional", path, version, lambda: conditional_fragment(path))
+
+    def run_righttyper(self, sessions=None, jobs=None, backend="auto"):
+        runs = [(path, session) for path in self.paths for session in (sessions or [None])]
+        version = analysis_cache.tool_version(righttyper, type_inference)
+        outcomes = {}
+        if self.cache is not None:
+            for run in runs:
+                outcome = self.cache.get("righttyper", run_key(*run), version)
+                if outcome is not None:
+                    outcomes[run] = outcome
+        missing = [run for run in runs if run not in outcomes]
+        for run, outcome in zip(missing, righttyper.trace_runs(missing, backend, jobs)):
+            outcomes[run] = outcome
+            if self.cache is not None:
+                self.cache.put("righttyper", run_key(*run), version, run_dependencies(run, outcome[0]), outcome)
+
+        righttyper.reset_observations()
+        results = []
+        for run in runs:
+            observed, covered, error = outcomes[run]
+            righttyper.merge_observations(observed)
+            results.append((*run, covered, error))
+        righttyper.print_results(results, sessions is not None)
+        self.traced = True
+
+    def rows(self):
+        """Yields the rows of the combined report, in the order generate_csv writes them."""
+        if self.traced:
+            yield from righttyper.report_records()
+        yield from generate_csv.variable_rows(
+            [fname, func, var, vartype] for (fname, func, var), vartype in sorted(self.variable_types.items())
+        )
+        for path in self.paths:
+            yield from generate_csv.ast_rows(self.ast_annotations.get(path, []))
+        for path, annotations in self.conditional.items():
+            yield from generate_csv.conditional_rows(os.path.basename(path), annotations.items())
+
+    def write_report(self, output_file=generate_csv.FINAL_REPORT, sort=False):
+        rows = self.rows()
+        if sort:
+            rows = generate_csv.sorted_rows(rows)
+        generate_csv.write_combined_report(rows, output_file)
+
+    def write_intermediates(self):
+        """Writes each annotator's own report file, as the separate tools would."""
+        variable_annotator.write_report(self.variable_types)
+        for path in self.paths:
+            AST_Annotator.generate_report(path, self.ast_annotations.get(path, []))
+        for path, annotations in self.conditional.items():
+            if annotations:
+                conditional_annotator.generate_runtime_annotation_report(path, annotations)
+        if self.traced:
+            righttyper.write_report(righttyper.build_report(), righttyper.MERGED_REPORT)
+
+
+def find_sources(paths):
+    """Expands directories and glob patterns to the .py files they cover, in sorted order."""
+    return variable_annotator.expand_paths(paths)
+
+
+def static_fragment(path, known_returns=None):
+    """Both static annotators' findings for one file, given the return types it imports."""
+    inferer = variable_annotator.infer_module(path, known_returns, CombinedInferer)
+    return {
+        "variables": [[*key, vartype] for key, vartype in inferer.variable_types.items()],
+        "ast": inferer.ast_annotations.get(path, []),
+        "function_returns": inferer.defined_returns,
+    }
+
+
+def conditional_fragment(path):
+    """conditional_annotator's findings for path and the local source files the run imported."""
+    annotations = conditional_annotator.execute_and_analyze(path)
+    # The run may import local modules, or use ones an earlier run left behind:
+    # the result depends on all of them, but not on the standard library or
+    # installed packages.
+    deps = [path] + [
+        module.__file__ for module in list(sys.modules.values())
+        if getattr(module, "__file__", None) and not os.path.abspath(module.__file__).startswith(LIBRARY_PATHS)
+    ]
+    return annotations, deps
+
+
+def run_key(path, session):
+    return path if session is None else f"{path}\0{session}"
+
+
+def run_dependencies(run, observed):
+    """Files a traced run's result was derived from: the script, its session and the traced modules."""
+    path, session = run
+    deps = {path, *observed["calls"], *observed["returns"], *observed["signatures"]}
+    if session is not None:
+        deps.add(session)
+    return sorted(deps)
@@ -0,0 +1,52 @@
+import ast
+import hashlib
+import os
+
+# Parsed trees, shared by every annotator in the process so each file is parsed
+# once per run however many tools look at it. Trees are keyed by a hash of the
+# source, so a file that changes on disk is parsed again. Callers share the same
+# tree objects and must not modify them.
+MAX_TREES = 1024
+
+_trees: dict[str, ast.Module] = {}
+# Absolute path -> ((mtime_ns, size), content hash); unchanged files are not re-read
+_paths: dict[str, tuple[tuple[int, int], str]] = {}
+_stats = {"hits": 0, "misses": 0}
+
+def source_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def parse_file(path: str) -> ast.Module:
+    """Returns the parsed tree of path, parsing it only if its content is new."""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stat_key = (st.st_mtime_ns, st.st_size)
+    known = _paths.get(path)
+    if known is not None and known[0] == stat_key and known[1] in _trees:
+        _stats["hits"] += 1
+        return _trees[known[1]]
+
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = source_hash(data)
+    _paths[path] = (stat_key, digest)
+    tree = _trees.get(digest)
+    if tree is not None:
+        _stats["hits"] += 1
+        return tree
+
+    _stats["misses"] += 1
+    tree = ast.parse(data, filename=path)
+    if len(_trees) >= MAX_TREES:
+        # Oldest first: a run visits files in order, so the oldest is done with
+        del _trees[next(iter(_trees))]
+    _trees[digest] = tree
+    return tree
+
+def cache_info() -> dict:
+    return {**_stats, "trees": len(_trees)}
+
+def clear() -> None:
+    _trees.clear()
+    _paths.clear()
+    _stats["hits"] = _stats["misses"] = 0
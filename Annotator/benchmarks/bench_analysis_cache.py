@@ -0,0 +1,71 @@
+# bench_analysis_cache.py
+#
+# Runs the static annotators of the pipeline over N generated modules with an
+# analysis cache: a cold run, a re-run with nothing changed, and a re-run after
+# editing one module.
+#
+#   python benchmarks/bench_analysis_cache.py [N]
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ast_cache
+from analysis_cache import AnalysisCache
+from annotation_engine import AnnotationEngine
+
+MODULE = '''
+import json
+
+CONFIG = {"name": "module", "retries": 3}
+
+def load(path, default=None):
+    with open(path) as f:
+        data = json.load(f)
+    items = [item for item in data if item]
+    return items or default
+
+def summarize(items, limit: int = 10) -> dict:
+    total = 0
+    for i, item in enumerate(items):
+        total += len(str(item))
+    return {"total": total, "count": len(items)}
+'''
+
+def run(paths, cache_path, report):
+    # A fresh cache and engine, as in a new process
+    ast_cache.clear()
+    start = time.perf_counter()
+    cache = AnalysisCache(cache_path)
+    engine = AnnotationEngine(paths, cache)
+    engine.run_static()
+    engine.write_report(report)
+    cache.save()
+    cache.close()
+    return time.perf_counter() - start, cache.stats
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(n):
+            paths.append(os.path.join(tmp, f"module_{i}.py"))
+            with open(paths[-1], "w") as f:
+                f.write(f"# module {i}\n" + MODULE * 5)
+        cache_path = os.path.join(tmp, "cache.sqlite")
+        report = os.path.join(tmp, "report.csv")
+
+        print(f"{n} modules")
+        print(f"{'run':<12} {'reused':>7} {'analyzed':>9} {'time':>9}")
+        for name in ("cold", "unchanged", "one edited"):
+            if name == "one edited":
+                with open(paths[n // 2], "a") as f:
+                    f.write("\nEDITED = True\n")
+            elapsed, stats = run(paths, cache_path, report)
+            print(f"{name:<12} {stats['hits']:>7} {stats['misses']:>9} {elapsed:>8.2f}s")
+
+if __name__ == "__main__":
+    main()
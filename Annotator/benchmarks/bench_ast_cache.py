@@ -0,0 +1,90 @@
+# bench_ast_cache.py
+#
+# Runs AST_Annotator and variable_annotator over N generated modules, first
+# with each tool parsing every file itself, then sharing ast_cache between
+# them, and reports parse counts and time spent parsing.
+#
+#   python benchmarks/bench_ast_cache.py [N]
+
+import ast
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import AST_Annotator
+import ast_cache
+import variable_annotator
+
+MODULE = '''
+import json
+
+CONFIG = {"name": "module", "retries": 3}
+
+def load(path, default=None):
+    with open(path) as f:
+        data = json.load(f)
+    items = [item for item in data if item]
+    return items or default
+
+def summarize(items, limit: int = 10) -> dict:
+    total = 0
+    for i, item in enumerate(items):
+        total += len(str(item))
+        if i > limit:
+            break
+    return {"total": total, "count": len(items)}
+'''
+
+def run_ast_annotator(paths):
+    for path in paths:
+        AST_Annotator.analyze_code_for_types(path)
+
+def run_variable_annotator(paths):
+    inferer = variable_annotator.VariableTypeInferer()
+    for path in paths:
+        inferer.analyze_file(path)
+
+def timed_parse():
+    # Wraps ast.parse as seen by ast_cache to total the time spent parsing
+    real_parse = ast.parse
+    spent = [0.0]
+    def parse(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return real_parse(*args, **kwargs)
+        finally:
+            spent[0] += time.perf_counter() - start
+    ast_cache.ast.parse = parse
+    return spent, lambda: setattr(ast_cache.ast, "parse", real_parse)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(n):
+            paths.append(os.path.join(tmp, f"module_{i}.py"))
+            with open(paths[-1], "w") as f:
+                f.write(f"# module {i}\n" + MODULE * 5)
+
+        print(f"{'mode':<10} {'parses':>7} {'parse time':>11} {'total':>9}")
+        for mode in ("separate", "shared"):
+            ast_cache.clear()
+            spent, restore = timed_parse()
+            parses = 0
+            start = time.perf_counter()
+            for tool in (run_ast_annotator, run_variable_annotator):
+                if mode == "separate":
+                    # As when each tool runs in its own process
+                    parses += ast_cache.cache_info()["misses"]
+                    ast_cache.clear()
+                tool(paths)
+            parses += ast_cache.cache_info()["misses"]
+            total = time.perf_counter() - start
+            restore()
+            print(f"{mode:<10} {parses:>7} {spent[0]:>10.3f}s {total:>8.3f}s")
+
+if __name__ == "__main__":
+    main()
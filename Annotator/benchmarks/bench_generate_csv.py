@@ -0,0 +1,56 @@
+# bench_generate_csv.py
+#
+# Merges large generated annotator reports with generate_csv, streaming and
+# with --sort at several memory budgets, and reports time and peak memory
+# (tracemalloc, so timings are inflated).
+#
+#   python benchmarks/bench_generate_csv.py [ROWS]
+
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_csv
+
+def write_reports(directory, rows):
+    with open(os.path.join(directory, "variable_annotation_report.txt"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Filename", "Function", "Variable Name", "Inferred Type"])
+        for i in range(rows):
+            writer.writerow([f"module_{i % 997}.py", f"func_{i % 101}", f"var_{i}", "dict[str, int]"])
+    os.mkdir(os.path.join(directory, generate_csv.TESTCASES))
+    with open(os.path.join(directory, generate_csv.TESTCASES, "big_AST_report.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["File", "Variable/Function", "Type Hint"])
+        for i in range(rows):
+            # Every row twice: --sort drops the duplicates
+            writer.writerow([f"module_{i % 997}.py", f"var_{i // 2}", "List[int]"])
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        write_reports(tmp, rows)
+        os.chdir(tmp)
+        print(f"{2 * rows} input rows")
+        print(f"{'mode':<22} {'time':>8} {'peak memory':>12}")
+        for name, options in (
+            ("stream", {}),
+            ("sort, in memory", {"sort": True, "max_rows": 2 * rows}),
+            ("sort, 50k rows", {"sort": True, "max_rows": 50_000}),
+            ("sort, 10k rows", {"sort": True, "max_rows": 10_000}),
+        ):
+            tracemalloc.start()
+            start = time.perf_counter()
+            generate_csv.generate_combined_report("report.csv", **options)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:<22} {elapsed:>7.2f}s {peak / 2**20:>10.1f}MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# bench_righttyper.py
+#
+# Runs a call-heavy workload untraced and under each righttyper tracing
+# backend available on this interpreter, and reports the slowdown factor,
+# recording every call and then sampling (first 100 calls, then 1 in 100).
+# The sys.monitoring backend needs Python 3.12+.
+#
+#   python3.12 benchmarks/bench_righttyper.py [N]
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import righttyper
+
+WORKLOAD = '''
+import json, re
+
+def area(width, height):
+    return width * height
+
+def label(name, tags):
+    return name + ":" + ",".join(tags)
+
+def parse(line):
+    return re.split(r"\\s+", line.strip())
+
+def run(n):
+    total = 0
+    for i in range(n):
+        total += area(i, 2.5)
+        label("task", ["a", "b"])
+        parse(" x  y ")
+        json.dumps({"i": i})
+    return total
+
+run(N)
+'''
+
+def timed_run(path, backend):
+    righttyper.traced_calls.clear()
+    righttyper.traced_returns.clear()
+    start = time.perf_counter()
+    if backend is None:
+        righttyper.runpy.run_path(path, run_name="__main__")
+    else:
+        righttyper.trace_script(path, [], backend)
+    return time.perf_counter() - start
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    backends = ["profile"]
+    if hasattr(sys, "monitoring"):
+        backends.append("monitoring")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "workload.py")
+        with open(path, "w") as f:
+            f.write(WORKLOAD.replace("run(N)", f"run({n})"))
+        baseline = timed_run(path, None)
+        print(f"{'backend':<11} {'sampling':<11} {'time':>9} {'slowdown':>9}")
+        print(f"{'untraced':<11} {'-':<11} {baseline:>8.3f}s {1:>8.1f}x")
+        for backend in backends:
+            for first, every in ((0, 1), (100, 100)):
+                righttyper.set_sampling(first, every)
+                elapsed = timed_run(path, backend)
+                sampling = "all" if every == 1 else f"{first}+1/{every}"
+                print(f"{backend:<11} {sampling:<11} {elapsed:>8.3f}s {elapsed / baseline:>8.1f}x")
+        righttyper.set_sampling()
+
+if __name__ == "__main__":
+    main()
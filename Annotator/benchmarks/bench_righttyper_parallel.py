@@ -0,0 +1,48 @@
+# bench_righttyper_parallel.py
+#
+# Traces K copies of a call-heavy script the way the Taskfile used to (one
+# righttyper.py process per script, one after another) and with --each, which
+# runs them in a process pool and writes one merged report.
+#
+#   python3.12 benchmarks/bench_righttyper_parallel.py [K] [N]
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_righttyper import WORKLOAD
+
+RIGHTTYPER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "righttyper.py")
+
+def timed(cmds, cwd):
+    start = time.perf_counter()
+    for cmd in cmds:
+        subprocess.run(cmd, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        scripts = []
+        for i in range(k):
+            scripts.append(f"workload_{i}.py")
+            with open(os.path.join(tmp, scripts[-1]), "w") as f:
+                f.write(WORKLOAD.replace("run(N)", f"run({n})"))
+        serial = timed([[sys.executable, RIGHTTYPER, script] for script in scripts], tmp)
+        print(f"{k} scripts, {os.cpu_count()} CPUs")
+        print(f"{'serial loop':<16} {serial:>8.2f}s")
+        jobs = 1
+        while True:
+            elapsed = timed([[sys.executable, RIGHTTYPER, "--each", "-j", str(jobs), *scripts]], tmp)
+            print(f"{f'--each -j {jobs}':<16} {elapsed:>8.2f}s {serial / elapsed:>6.1f}x")
+            if jobs >= min(k, os.cpu_count() or 1):
+                break
+            jobs = min(jobs * 2, k, os.cpu_count() or 1)
+
+if __name__ == "__main__":
+    main()
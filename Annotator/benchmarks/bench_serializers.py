@@ -0,0 +1,56 @@
+# bench_serializers.py
+#
+# Times writing and reading a tasks.json snapshot of N tasks with each
+# serializer, next to the indent=4 JSON that save_tasks used to write.
+#
+#   python benchmarks/bench_serializers.py [N ...]     (default 10000 100000 1000000)
+
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import task_store
+
+def make_tasks(n):
+    tasks = []
+    for i in range(n):
+        task = {"id": i + 1, "description": f"task {i}", "due_date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+                "category": f"c{i % 7}"}
+        task_store._ensure_due_ordinal(task)
+        tasks.append(task)
+    return tasks
+
+class LegacyJson:
+    name = "json indent=4"
+
+    def dump(self, snapshot, file):
+        file.write(json.dumps(snapshot["tasks"], indent=4).encode())
+
+    def load(self, data):
+        return json.loads(data)
+
+def bench(serializer, snapshot):
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    serializer.dump(snapshot, buffer)
+    dumped = time.perf_counter()
+    serializer.load(buffer.getvalue())
+    loaded = time.perf_counter()
+    return dumped - start, loaded - dumped, buffer.tell()
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+    serializers = [LegacyJson(), *task_store.SERIALIZERS.values()]
+    print(f"{'tasks':>8} {'format':<14} {'write':>9} {'read':>9} {'size':>12}")
+    for n in sizes:
+        snapshot = {"seq": 0, "next_id": n + 1, "tasks": make_tasks(n)}
+        for serializer in serializers:
+            write, read, size = bench(serializer, snapshot)
+            print(f"{n:>8} {serializer.name:<14} {write:>8.3f}s {read:>8.3f}s {size / 1e6:>10.2f}MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# bench_task_store.py
+#
+# Compares add_tasks_bulk against N single add_task calls for each task store
+# backend. Runs in a scratch directory so the real tasks.json is untouched.
+#
+#   python benchmarks/bench_task_store.py [N]
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import task_manager
+import task_store
+
+def make_rows(n):
+    return [
+        {"description": f"task {i}", "due_date": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "category": f"c{i % 7}"}
+        for i in range(n)
+    ]
+
+def reset_stores():
+    for store in task_store._stores.values():
+        store.close()
+    task_store._stores.clear()
+
+def bench_single(rows):
+    start = time.perf_counter()
+    for row in rows:
+        task_manager.add_task(row["description"], row["due_date"], row["category"])
+    return time.perf_counter() - start
+
+def bench_bulk(rows):
+    start = time.perf_counter()
+    task_manager.add_tasks_bulk(rows)
+    return time.perf_counter() - start
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rows = make_rows(n)
+    print(f"{'backend':<8} {'single add_task':>16} {'add_tasks_bulk':>16} {'speedup':>8}")
+    for backend in task_store.BACKENDS:
+        os.environ[task_store.BACKEND_ENV] = backend
+        timings = []
+        for bench in (bench_single, bench_bulk):
+            with tempfile.TemporaryDirectory() as tmp:
+                os.chdir(tmp)
+                timings.append(bench(rows))
+                reset_stores()
+        single, bulk = timings
+        print(f"{backend:<8} {single:>15.3f}s {bulk:>15.3f}s {single / bulk:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+# bench_type_inference.py
+#
+# Times the shared TypeInferer on large and self-referencing containers,
+# in righttyper's and conditional_annotator's notation.
+#
+#   python benchmarks/bench_type_inference.py [N]
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conditional_annotator import RuntimeTypeInferer
+from type_inference import TypeInferer
+
+def make_values(n):
+    cyclic = {"name": "root", "children": []}
+    cyclic["children"].append(cyclic)
+    return {
+        f"list of {n} ints": list(range(n)),
+        f"dict of {n} str -> float": {str(i): float(i) for i in range(n)},
+        f"{n} nested records": [{"id": i, "tags": ["a", "b"], "scores": [1.0, 2]} for i in range(n)],
+        "self-referencing dict": cyclic,
+    }
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    values = make_values(n)
+    for inferer in (TypeInferer(), RuntimeTypeInferer()):
+        print(type(inferer).__name__)
+        for label, value in values.items():
+            runs = 1000
+            seconds = timeit.timeit(lambda: inferer(value), number=runs) / runs
+            print(f"  {label:<28} {seconds * 1e6:>8.1f}us  {inferer(value)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# bench_variable_annotator.py
+#
+# Times variable_annotator.analyze_files over N generated modules with an
+# increasing number of worker processes.
+#
+#   python benchmarks/bench_variable_annotator.py [N]
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import variable_annotator
+
+MODULE = '''
+import json
+
+def load(path, default=None):
+    with open(path) as f:
+        data = json.load(f)
+    items = [item for item in data if item]
+    return items or default
+
+def summarize(items, limit: int = 10) -> dict:
+    total = 0
+    for i, item in enumerate(items):
+        total += len(str(item))
+    return {"total": total, "count": len(items)}
+'''
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(n):
+            with open(os.path.join(tmp, f"module_{i}.py"), "w") as f:
+                f.write(f"# module {i}\n" + MODULE * 10)
+        files = variable_annotator.expand_paths([tmp])
+
+        cpus = os.cpu_count() or 1
+        print(f"{n} modules, {cpus} CPUs")
+        jobs = 1
+        while True:
+            start = time.perf_counter()
+            variable_types, _ = variable_annotator.analyze_files(files, jobs)
+            elapsed = time.perf_counter() - start
+            print(f"-j {jobs:<3} {elapsed:>8.2f}s {n / elapsed:>8.0f} files/s  ({len(variable_types)} variables)")
+            if jobs >= cpus:
+                break
+            jobs = min(jobs * 2, cpus)
+
+if __name__ == "__main__":
+    main()
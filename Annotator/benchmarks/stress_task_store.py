@@ -0,0 +1,75 @@
+# stress_task_store.py
+#
+# Multi-process stress test for the task stores: several processes add tasks
+# (and delete every tenth one they added) against the same store at once,
+# then the survivors are checked for lost or duplicated writes. A low
+# compaction threshold makes compactions race with the writers too.
+#
+#   python benchmarks/stress_task_store.py [processes] [tasks_per_process]
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import task_manager
+import task_store
+
+COMPACT_THRESHOLD = 100
+
+def worker(directory, backend, worker_id, n):
+    os.chdir(directory)
+    os.environ[task_store.BACKEND_ENV] = backend
+    task_store.COMPACT_THRESHOLD = COMPACT_THRESHOLD
+    for i in range(n):
+        task = task_manager.create_task(f"w{worker_id}-{i}", f"2024-{i % 12 + 1:02d}-01", f"w{worker_id}")
+        if i % 10 == 9 and not task_manager.remove_task(task["id"]):
+            raise SystemExit(f"worker {worker_id} could not delete its own task {task['id']}")
+    task_store.get_store(task_manager.TASKS_DB if backend == "sqlite" else task_manager.TASKS_FILE).close()
+
+def check(backend, processes, n) -> bool:
+    os.environ[task_store.BACKEND_ENV] = backend
+    tasks = task_manager.load_tasks()
+    expected = {f"w{w}-{i}" for w in range(processes) for i in range(n) if i % 10 != 9}
+    found = [task["description"] for task in tasks]
+    ids = [task["id"] for task in tasks]
+    lost = expected - set(found)
+    ok = not lost and len(found) == len(expected) and len(set(ids)) == len(ids)
+    if lost:
+        print(f"  lost {len(lost)} tasks, e.g. {sorted(lost)[:5]}")
+    if len(found) != len(expected):
+        print(f"  expected {len(expected)} tasks, found {len(found)}")
+    if len(set(ids)) != len(ids):
+        print(f"  {len(ids) - len(set(ids))} duplicate ids")
+    return ok
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    ops = processes * (n + n // 10)
+    failed = False
+    for backend in task_store.BACKENDS:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            workers = [multiprocessing.Process(target=worker, args=(tmp, backend, w, n)) for w in range(processes)]
+            for p in workers:
+                p.start()
+            for p in workers:
+                p.join()
+            elapsed = time.perf_counter() - start
+            os.chdir(tmp)
+            ok = check(backend, processes, n) and all(p.exitcode == 0 for p in workers)
+            for store in task_store._stores.values():
+                store.close()
+            task_store._stores.clear()
+            os.chdir("/")
+        failed = failed or not ok
+        print(f"{backend:<8} {processes} processes x {n} adds: {ops / elapsed:,.0f} ops/s "
+              f"({elapsed:.2f}s) {'OK' if ok else 'FAILED'}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,43 @@
 # cli.py
 
-from task_manager import add_task, list_tasks, flush_task, flush_all_tasks, delete_all_tasks
+import argparse
+import json
+import shlex
+import sys
+from task_manager import (add_task, iter_tasks, flush_task, flush_all_tasks, delete_all_tasks, import_tasks,
+                          export_tasks, create_task, remove_task, EXPORT_FIELDS)
 from tabulate import tabulate  # <-- Add this import statement to fix the error
 
+PAGE_SIZE = 20
+HEADERS = ["ID", "Task", "Due Date", "Category"]
+
+# Render tasks one page at a time, fetching only the rows on screen
+def show_task_pages(page_size=PAGE_SIZE) -> None:
+    page = 0
+    while True:
+        # One extra row tells us whether a next page exists
+        rows = [[task["id"], task["description"], task["due_date"], task["category"]]
+                for task in iter_tasks(offset=page * page_size, limit=page_size + 1)]
+        if not rows:
+            if page == 0:
+                print("\nNo tasks found.")
+                return
+            page -= 1
+            continue
+        has_next = len(rows) > page_size
+        print(f"\nTask Manager Dashboard (page {page + 1})\n")
+        print(tabulate(rows[:page_size], headers=HEADERS, tablefmt="grid"))
+        if page == 0 and not has_next:
+            return
+
+        nav = input("\n[n]ext page, [p]revious page, [q]uit listing: ").strip().lower()
+        if nav == "n" and has_next:
+            page += 1
+        elif nav == "p" and page > 0:
+            page -= 1
+        elif nav == "q":
+            return
+
 def main() -> None:
     while True:
         print("\nTask Manager CLI")
@@ -19,12 +54,7 @@ def main() -> None:
             category = input("Enter category: ")
             print(add_task(description, due_date, category))
         elif choice == "2":
-            tasks_table = list_tasks()
-            if isinstance(tasks_table, list):
-                print("\nTask Manager Dashboard\n")
-                print(tabulate(tasks_table, headers=["ID", "Task", "Due Date", "Category"], tablefmt="grid"))
-            else:
-                print(tasks_table)  # No tasks message
+            show_task_pages()
         elif choice == "3":
             print("\nFlush Task Options")
             print("1. Flush a specific task by ID")
@@ -49,5 +79,159 @@ def main() -> None:
         else:
             print("\nInvalid option, please try again.")
 
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Task Manager CLI. Runs the interactive menu when no command is given.")
+    parser.add_argument("--json", action="store_true", help="print one JSON document per command")
+    parser.add_argument("--batch", action="store_true",
+                        help="read one command per line from stdin and run them all in this process")
+    subparsers = parser.add_subparsers(dest="command")
+
+    add_parser = subparsers.add_parser("add", help="add a task")
+    add_parser.add_argument("--description", required=True)
+    add_parser.add_argument("--due-date", required=True, help="YYYY-MM-DD")
+    add_parser.add_argument("--category", required=True)
+
+    list_parser = subparsers.add_parser("list", help="list tasks in due date order")
+    add_filter_arguments(list_parser)
+    list_parser.add_argument("--offset", type=int, default=0)
+    list_parser.add_argument("--limit", type=int)
+
+    flush_parser = subparsers.add_parser("flush", help="delete a task by ID")
+    flush_parser.add_argument("task_id", type=int)
+
+    flush_all_parser = subparsers.add_parser("flush-all", help="delete every task")
+    flush_all_parser.add_argument("--yes", action="store_true", help="confirm deleting every task")
+
+    import_parser = subparsers.add_parser("import", help="bulk-load tasks from a CSV or JSONL file")
+    import_parser.add_argument("path", help="file to read, or - for stdin")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"],
+                               help="defaults to the file extension, or jsonl for stdin")
+
+    export_parser = subparsers.add_parser("export", help="stream tasks to a CSV or JSONL file")
+    export_parser.add_argument("path", help="file to write, or - for stdout")
+    export_parser.add_argument("--format", choices=["csv", "jsonl"],
+                               help="defaults to the file extension, or jsonl for stdout")
+    add_filter_arguments(export_parser)
+    return parser
+
+def add_filter_arguments(parser) -> None:
+    parser.add_argument("--category")
+    parser.add_argument("--due-after", help="YYYY-MM-DD, exclusive")
+    parser.add_argument("--due-before", help="YYYY-MM-DD, exclusive")
+
+def task_filters(args) -> dict:
+    return {"category": args.category, "due_after": args.due_after, "due_before": args.due_before}
+
+def public_task(task) -> dict:
+    return {field: task[field] for field in EXPORT_FIELDS}
+
+# Print a command result as JSON or as the given human-readable text
+def emit(args, payload, text) -> None:
+    print(json.dumps(payload) if args.json else text)
+
+def command_add(args) -> bool:
+    task = create_task(args.description, args.due_date, args.category)
+    emit(args, {"ok": True, "task": public_task(task)}, f"Task {task['id']} added.")
+    return True
+
+def command_list(args) -> bool:
+    tasks = iter_tasks(offset=args.offset, limit=args.limit, **task_filters(args))
+    if args.json:
+        # Written task by task so large listings never sit in memory as a whole
+        sys.stdout.write('{"ok": true, "tasks": [')
+        for i, task in enumerate(tasks):
+            sys.stdout.write(("" if i == 0 else ", ") + json.dumps(public_task(task)))
+        sys.stdout.write("]}\n")
+    else:
+        rows = [[task["id"], task["description"], task["due_date"], task["category"]] for task in tasks]
+        print(tabulate(rows, headers=HEADERS, tablefmt="grid") if rows else "No tasks found.")
+    return True
+
+def command_flush(args) -> bool:
+    removed = remove_task(args.task_id)
+    text = f"Task {args.task_id} removed." if removed else f"Task {args.task_id} not found."
+    emit(args, {"ok": removed, "id": args.task_id}, text)
+    return removed
+
+def command_flush_all(args) -> bool:
+    if not args.yes:
+        emit(args, {"ok": False, "error": "pass --yes to delete every task"},
+             "Refusing to delete every task without --yes.")
+        return False
+    delete_all_tasks()
+    emit(args, {"ok": True}, "All tasks successfully deleted.")
+    return True
+
+def command_import(args) -> bool:
+    imported = import_tasks(args.path, args.format)
+    emit(args, {"ok": True, "imported": imported}, f"Imported {imported} tasks.")
+    return True
+
+def command_export(args) -> bool:
+    exported = export_tasks(args.path, args.format, **task_filters(args))
+    if args.path == "-":
+        print(f"Exported {exported} tasks.", file=sys.stderr)
+    else:
+        emit(args, {"ok": True, "exported": exported}, f"Exported {exported} tasks.")
+    return True
+
+COMMANDS = {
+    "add": command_add,
+    "list": command_list,
+    "flush": command_flush,
+    "flush-all": command_flush_all,
+    "import": command_import,
+    "export": command_export,
+}
+
+def run_command(args) -> bool:
+    try:
+        return COMMANDS[args.command](args)
+    except (OSError, ValueError) as e:
+        emit(args, {"ok": False, "error": str(e)}, f"Error: {e}")
+        return False
+
+# Run one command per stdin line against the store this process already has
+# open. Lines use the same syntax as the command line; blank lines and lines
+# starting with # are skipped.
+def run_batch(parser, json_output) -> bool:
+    ok = True
+    for line in sys.stdin:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            words = shlex.split(line)
+        except ValueError as e:
+            # Unbalanced quotes
+            print(f"Error: {e}: {line}", file=sys.stderr)
+            ok = False
+            continue
+        try:
+            args = parser.parse_args(words)
+        except SystemExit:
+            # argparse has already printed the usage error to stderr
+            ok = False
+            continue
+        if args.command is None or args.batch:
+            print(f"Error: not a batch command: {line}", file=sys.stderr)
+            ok = False
+            continue
+        args.json = args.json or json_output
+        ok = run_command(args) and ok
+    return ok
+
+def run(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.batch:
+        ok = run_batch(parser, args.json)
+    elif args.command is None:
+        main()
+        ok = True
+    else:
+        ok = run_command(args)
+    return 0 if ok else 1
+
 if __name__ == "__main__":
-    main()
+    sys.exit(run())
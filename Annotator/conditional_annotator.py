@@ -2,6 +2,8 @@ import os
 import sys
 import csv
 from typing import Any, Dict
+from type_inference import TypeInferer
+import generate_csv
 
 def read_python_file(file_path: str) -> str:
     """Reads a Python file."""
@@ -12,28 +14,34 @@ def read_python_file(file_path: str) -> str:
         print(f"Error reading file: {e}")
         return None
 
+class RuntimeTypeInferer(TypeInferer):
+    """Names types with exact type() matches, in typing's List/Dict notation."""
+
+    list_name = "List"
+    dict_name = "Dict"
+    LEAF_TYPES = {int: "int", float: "float", str: "str", bool: "bool"}
+
+    def leaf_type(self, value: Any) -> str:
+        name = self.LEAF_TYPES.get(type(value))
+        if name is not None:
+            return name
+        elif callable(value):
+            return "function"
+        return "Any"
+
+    def container_kind(self, value: Any):
+        value_type = type(value)
+        return value_type if value_type in (list, dict) else None
+
+    def merge(self, types: set) -> str:
+        return ", ".join(sorted(types))
+
+runtime_type_inferer = RuntimeTypeInferer()
+
 def infer_runtime_types(var: Any) -> str:
     """Infers runtime types dynamically."""
     try:
-        var_type = type(var)
-        if var_type is int:
-            return "int"
-        elif var_type is float:
-            return "float"
-        elif var_type is str:
-            return "str"
-        elif var_type is bool:
-            return "bool"
-        elif var_type is list:
-            element_types = {infer_runtime_types(e) for e in var}
-            return f"List[{', '.join(element_types)}]" if element_types else "List[Any]"
-        elif var_type is dict:
-            key_types = {infer_runtime_types(k) for k in var.keys()}
-            value_types = {infer_runtime_types(v) for v in var.values()}
-            return f"Dict[{', '.join(key_types)}, {', '.join(value_types)}]" if key_types and value_types else "Dict[Any, Any]"
-        elif callable(var):
-            return "function"
-        return "Any"
+        return runtime_type_inferer(var)
     except Exception as e:
         return f"Invalid Type ({str(e)})"
 
@@ -57,6 +65,10 @@ def generate_runtime_annotation_report(file_path: str, annotations: Dict[str, st
             writer.writerow(["Variable Name", "Inferred Type"])
             for var, annotation in annotations.items():
                 writer.writerow([var, annotation])
+        generate_csv.write_records(
+            generate_csv.records_path(report_path),
+            generate_csv.conditional_rows(os.path.basename(file_path), annotations.items()),
+        )
         print(f"Runtime annotation CSV report generated: {report_path}")
     except Exception as e:
         print(f"Error generating report: {e}")
@@ -1,11 +1,28 @@
 import os
 import csv
 import re
+import heapq
+import json
+import argparse
+import tempfile
+from itertools import tee, zip_longest
+from operator import itemgetter
 
 ROOT = "."
 TESTCASES = "testcases"
 FINAL_REPORT = "combined_final_report.csv"
 
+def report_kind(fname):
+    if fname.endswith("_righttyper.out"):
+        return "righttyper"
+    elif fname == "variable_annotation_report.txt":
+        return "variable"
+    elif fname.endswith("_AST_report.csv"):
+        return "ast"
+    elif fname.endswith("_conditional_runtime_annotation_report.csv"):
+        return "conditional"
+    return None
+
 def collect_files():
     files = {
         "righttyper": [],
@@ -15,136 +32,233 @@ def collect_files():
     }
 
     for folder in [ROOT, TESTCASES]:
-        for fname in os.listdir(folder):
+        names = os.listdir(folder)
+        # A report's JSONL records are read instead of the report itself
+        recorded = {os.path.splitext(fname)[0] for fname in names if fname.endswith(".jsonl")}
+        for fname in names:
             path = os.path.join(folder, fname)
-            if fname.endswith("_righttyper.out"):
-                files["righttyper"].append(path)
-            elif fname == "variable_annotation_report.txt":
+            stem, ext = os.path.splitext(fname)
+            if ext == ".jsonl":
+                kind = next(filter(None, (report_kind(stem + ext) for ext in (".out", ".txt", ".csv"))), None)
+            elif stem in recorded:
+                continue
+            else:
+                kind = report_kind(fname)
+            if kind == "variable":
                 files["variable"] = path
-            elif fname.endswith("_AST_report.csv"):
-                files["ast"].append(path)
-            elif fname.endswith("_conditional_runtime_annotation_report.csv"):
-                files["conditional"].append(path)
+            elif kind is not None:
+                files[kind].append(path)
     return files
 
-def parse_variable_report(path):
-    if not path: return []
-    rows = []
+# ---------- Rows of the combined report, from each annotator's results ----------
+# Each builder yields rows as it reads its entries, so reports are streamed
+# to the output rather than held in memory.
+
+def variable_rows(entries):
+    """entries: (filename, function, variable, type) as in variable_annotation_report.txt"""
+    for fullpath, func, var, vtype in entries:
+        module = os.path.basename(fullpath)
+        yield (module, func, "-", "-", "-", "Variable_Annotator", var, vtype)
+
+def ast_rows(entries):
+    """entries: (file, variable or 'function (arg: name)', type hint) as in *_AST_report.csv"""
+    for file, var_func, vtype in entries:
+        module = os.path.basename(file)
+        # Check if it’s a function argument type
+        if "(arg:" in var_func:
+            func, arg = re.findall(r"(\w+)\s*\(arg:\s*(\w+)\)", var_func)[0]
+            yield (module, func, "-", arg, vtype, "AST", "-", "-")
+        else:
+            yield (module, "-", "-", "-", "-", "AST", var_func, vtype)
+
+def conditional_rows(module, entries):
+    """entries: (variable, inferred type) for one module"""
+    for var_name, inferred_type in entries:
+        yield (module, var_name if var_name not in ("json", "os", "datetime", "Any", "TASKS_FILE") else "-", "-", "-", "-", "Conditional", var_name, inferred_type)
+
+def righttyper_rows(module, function, params, return_type):
+    """params: (argument, type) pairs of one inferred signature"""
+    for var, vtype in params:
+        yield (module, function, "-", var, vtype, "RightTyper", "-", "-")
+    yield (module, function, return_type, "-", "-", "RightTyper", "-", "-")
+
+# ---------- JSONL records ----------
+# Each annotator also writes its findings next to its report, in
+# <report>.jsonl: one JSON object per row of the combined report, keyed by
+# the report's column names. generate_csv reads those rather than parsing
+# the human-oriented reports.
+
+RECORD_FIELDS = (
+    "Module",
+    "Function",
+    "Function_Return_Type",
+    "Function_Arguments",
+    "Function_Argument_Type",
+    "Annotator_Type",
+    "Variable_Name",
+    "Variable_Type",
+)
+
+def records_path(report_path):
+    return os.path.splitext(report_path)[0] + ".jsonl"
+
+def write_records(path, rows):
+    with open(path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(dict(zip(RECORD_FIELDS, row))) + "\n")
+    return path
+
+_decode = json.JSONDecoder().decode
+_record_row = itemgetter(*RECORD_FIELDS)
+
+def read_records(path):
     with open(path) as f:
-        next(f)  # Skip header
         for line in f:
-            parts = line.strip().split(",")
-            if len(parts) != 4:
-                continue
-            fullpath, func, var, vtype = parts
-            module = os.path.basename(fullpath)
-            rows.append((module, func, "-", "-", "-", "Variable_Annotator", var, vtype))
-    return rows
+            if line.strip():
+                yield _record_row(_decode(line))
+
+# ---------- Parsing the annotators' report files ----------
+
+def parse_variable_report(path):
+    if not path:
+        return
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Skip header
+        yield from variable_rows(row for row in reader if len(row) == 4)
 
 def parse_csv_report(path, label):
-    rows = []
-    with open(path) as f:
+    with open(path, newline="") as f:
         reader = csv.reader(f)
         header = next(reader, [])
-        for row in reader:
-            if label == "AST":
-                file, var_func, vtype = row
-                module = os.path.basename(file)
-                # Check if it’s a function argument type
-                if "(arg:" in var_func:
-                    func, arg = re.findall(r"(\w+)\s*\(arg:\s*(\w+)\)", var_func)[0]
-                    rows.append((module, func, "-", arg, vtype, "AST", "-", "-"))
-                else:
-                    rows.append((module, "-", "-", "-", "-", "AST", var_func, vtype))
-            elif label == "Conditional":
-                var_name, inferred_type = row
-                module = os.path.basename(path).replace("_conditional_runtime_annotation_report.csv", ".py")
-                rows.append((module, var_name if var_name not in ("json", "os", "datetime", "Any", "TASKS_FILE") else "-", "-", "-", "-", "Conditional", var_name, inferred_type))
-    return rows
+        if label == "AST":
+            yield from ast_rows(reader)
+        elif label == "Conditional":
+            module = os.path.basename(path).replace("_conditional_runtime_annotation_report.csv", ".py")
+            yield from conditional_rows(module, reader)
 
 def parse_righttyper(path):
-    results = []
     current_module = os.path.basename(path).replace("_righttyper.out", ".py")
     current_function = ""
     return_type = ""
     params = []
 
     with open(path) as f:
-        lines = f.readlines()
-
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if line.startswith("- def "):
-            func_match = re.match(r"- def (\w+)\((.*?)\)(?: -> (.*))?:", line)
-            if func_match:
-                current_function = func_match.group(1)
-                args = func_match.group(2)
-                return_type = func_match.group(3) or "-"
-                params = [p.strip() for p in args.split(",") if p.strip()]
-        elif line.startswith("+ def "):
-            annot_match = re.match(r"\+ def (\w+)\((.*?)\) -> (.+):", line)
-            if annot_match:
-                current_function = annot_match.group(1)
-                args = annot_match.group(2)
-                return_type = annot_match.group(3)
-                args = [a.strip() for a in args.split(",") if a.strip()]
-                for a in args:
-                    if ": " in a:
-                        var, vtype = a.split(": ")
-                        results.append((
-                            current_module,
-                            current_function,
-                            "-",
-                            var,
-                            vtype,
-                            "RightTyper",
-                            "-",
-                            "-"
-                        ))
-                results.append((
-                    current_module,
-                    current_function,
-                    return_type,
-                    "-",
-                    "-",
-                    "RightTyper",
-                    "-",
-                    "-"
-                ))
-    return results
-
-def generate_combined_report():
-    files = collect_files()
-    final_rows = []
+        # Each line with the one after it: a section header is recognised by its underline
+        lines, following = tee(f)
+        next(following, None)
+        for line, next_line in zip_longest(lines, following, fillvalue=""):
+            line = line.strip()
+            if line.endswith(":") and next_line.startswith("=" * 42):
+                # Section header naming the traced file; merged reports cover several modules
+                current_module = os.path.basename(line[:-1])
+            elif line.startswith("- def "):
+                func_match = re.match(r"- def (\w+)\((.*?)\)(?: -> (.*))?:", line)
+                if func_match:
+                    current_function = func_match.group(1)
+                    args = func_match.group(2)
+                    return_type = func_match.group(3) or "-"
+                    params = [p.strip() for p in args.split(",") if p.strip()]
+            elif line.startswith("+ def "):
+                annot_match = re.match(r"\+ def (\w+)\((.*?)\) -> (.+):", line)
+                if annot_match:
+                    current_function = annot_match.group(1)
+                    args = annot_match.group(2)
+                    return_type = annot_match.group(3)
+                    args = [a.strip() for a in args.split(",") if a.strip()]
+                    params = [a.split(": ") for a in args if ": " in a]
+                    yield from righttyper_rows(current_module, current_function, params, return_type)
+
+# ---------- Sorting and deduplication ----------
+
+# Rows sorted in memory at a time; larger reports are sorted in runs spilled to
+# temporary files and merged back.
+MAX_ROWS_IN_MEMORY = 200_000
+
+def sort_key(row):
+    # (Module, Function, Variable_Name) first, then the rest of the row so
+    # identical rows end up next to each other
+    return (row[0], row[1], row[6], *row)
+
+def _spill(rows, directory):
+    run = tempfile.TemporaryFile("w+", newline="", dir=directory)
+    csv.writer(run).writerows(rows)
+    run.seek(0)
+    return run
 
+def sorted_rows(rows, max_rows=MAX_ROWS_IN_MEMORY, tmp_dir=None):
+    """Yields rows sorted by (Module, Function, Variable_Name) with duplicate rows dropped.
+
+    At most max_rows rows are held in memory; beyond that, sorted runs are
+    written to temporary files and merged.
+    """
+    runs = []
+    chunk = []
+    try:
+        for row in rows:
+            chunk.append(tuple(row))
+            if len(chunk) >= max_rows:
+                chunk.sort(key=sort_key)
+                runs.append(_spill(chunk, tmp_dir))
+                chunk = []
+        chunk.sort(key=sort_key)
+        if runs:
+            merged = heapq.merge(chunk, *(map(tuple, csv.reader(run)) for run in runs), key=sort_key)
+        else:
+            merged = chunk
+        previous = None
+        for row in merged:
+            if row != previous:
+                yield row
+            previous = row
+    finally:
+        for run in runs:
+            run.close()
+
+# ---------- Combined report ----------
+
+def report_rows(path, parse, *args):
+    if path and path.endswith(".jsonl"):
+        return read_records(path)
+    return parse(path, *args)
+
+def combined_rows(files):
+    """Rows of every report in files, read lazily one report after another."""
     for path in files["righttyper"]:
-        final_rows.extend(parse_righttyper(path))
+        yield from report_rows(path, parse_righttyper)
 
-    final_rows.extend(parse_variable_report(files["variable"]))
+    yield from report_rows(files["variable"], parse_variable_report)
 
     for path in files["ast"]:
-        final_rows.extend(parse_csv_report(path, "AST"))
+        yield from report_rows(path, parse_csv_report, "AST")
 
     for path in files["conditional"]:
-        final_rows.extend(parse_csv_report(path, "Conditional"))
+        yield from report_rows(path, parse_csv_report, "Conditional")
 
-    with open(FINAL_REPORT, "w", newline="") as f:
+def generate_combined_report(output_file=FINAL_REPORT, sort=False, max_rows=MAX_ROWS_IN_MEMORY):
+    rows = combined_rows(collect_files())
+    if sort:
+        rows = sorted_rows(rows, max_rows)
+    write_combined_report(rows, output_file)
+
+def write_combined_report(final_rows, output_file=FINAL_REPORT):
+    """Writes rows as they come, numbering them; final_rows may be any iterable."""
+    with open(output_file, "w", newline="") as f:
         writer = csv.writer(f)
-        writer.writerow([
-            "SL_No",
-            "Module",
-            "Function",
-            "Function_Return_Type",
-            "Function_Arguments",
-            "Function_Argument_Type",
-            "Annotator_Type",
-            "Variable_Name",
-            "Variable_Type"
-        ])
-        for i, row in enumerate(final_rows, start=1):
-            writer.writerow([i] + list(row))
-
-    print(f"[+] Final report generated: {FINAL_REPORT}")
+        writer.writerow(["SL_No", *RECORD_FIELDS])
+        writer.writerows((i, *row) for i, row in enumerate(final_rows, start=1))
+
+    print(f"[+] Final report generated: {output_file}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Merge the annotators' reports into one CSV report.")
+    parser.add_argument("-o", "--output", default=FINAL_REPORT, help="Combined report file")
+    parser.add_argument("--sort", action="store_true",
+                        help="Sort rows by module, function and variable and drop duplicate rows")
+    parser.add_argument("--max-rows", type=int, default=MAX_ROWS_IN_MEMORY,
+                        help="Rows sorted in memory before spilling to temporary files (with --sort)")
+    return parser
 
 if __name__ == "__main__":
-    generate_combined_report()
+    options = build_parser().parse_args()
+    generate_combined_report(options.output, options.sort, options.max_rows)
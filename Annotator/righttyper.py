@@ -1,139 +1,587 @@
 import sys
 import os
-import ast
 import inspect
 import runpy
-from types import FrameType
+import argparse
+import builtins
+import json
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from types import CodeType, FrameType
 from typing import Any, Union, get_type_hints
-from collections import defaultdict
+from collections import Counter, defaultdict
+from type_inference import TypeInferer, merge_types
+import generate_csv
 
-traced_calls: dict[str, dict[str, list[list[Any]]]] = defaultdict(lambda: defaultdict(list))
-traced_returns: dict[str, dict[str, list[Any]]] = defaultdict(lambda: defaultdict(list))
+# Observed types, counted as the program runs: values are not kept alive, and
+# memory grows with the number of distinct types rather than the number of calls.
+# filename -> function -> parameter name -> type string -> count
+traced_calls: dict[str, dict[str, dict[str, Counter]]] = defaultdict(lambda: defaultdict(lambda: defaultdict(Counter)))
+# filename -> function -> type string -> count
+traced_returns: dict[str, dict[str, Counter]] = defaultdict(lambda: defaultdict(Counter))
+# filename -> function -> {"name", "signature", "params"}, read from the live module
+# once tracing stops, so the report never runs or parses the traced code again
+traced_signatures: dict[str, dict[str, dict]] = defaultdict(dict)
+# Globals of each traced module, held until capture_signatures() has read them
+_module_globals: dict[str, dict] = {}
 
-def tracefunc(frame: FrameType, event: str, arg: Any):
-    if event not in {"call", "return"}:
+# Sampling: every call of a function up to sample_first, then one in sample_every.
+# The default records every call.
+sample_first = 0
+sample_every = 1
+_call_counts: dict[CodeType, int] = {}
+_return_counts: dict[CodeType, int] = {}
+
+BACKENDS = ("auto", "monitoring", "profile")
+THIS_FILE = os.path.abspath(__file__)
+MERGED_REPORT = "merged_righttyper.out"
+
+# ---------- Tracing ----------
+
+# Per code object: the names of its arguments if it should be traced, else None.
+# Filtering looks at the filesystem once per function instead of once per call.
+_code_args: dict[CodeType, Union[tuple[str, ...], None]] = {}
+
+def traced_args(code: CodeType) -> Union[tuple[str, ...], None]:
+    try:
+        return _code_args[code]
+    except KeyError:
+        pass
+    filename = code.co_filename
+    if (filename.startswith(sys.prefix) or 'site-packages' in filename
+            or not os.path.exists(filename) or os.path.abspath(filename) == THIS_FILE):
+        names = None
+    else:
+        names = code.co_varnames[:code.co_argcount + code.co_kwonlyargcount]
+    _code_args[code] = names
+    return names
+
+def set_sampling(first: int = 0, every: int = 1) -> None:
+    global sample_first, sample_every
+    if first < 0 or every < 1:
+        raise ValueError("Sampling needs first >= 0 and every >= 1")
+    sample_first, sample_every = first, every
+
+def sampled(counts: dict[CodeType, int], code: CodeType) -> bool:
+    if sample_every == 1:
+        return True
+    seen = counts[code] = counts.get(code, 0) + 1
+    return seen <= sample_first or (seen - sample_first) % sample_every == 0
+
+def record_call(code: CodeType, frame: FrameType, names: tuple[str, ...]) -> None:
+    if code.co_filename not in _module_globals:
+        _module_globals[code.co_filename] = frame.f_globals
+    params = traced_calls[code.co_filename][code.co_name]
+    if not sampled(_call_counts, code):
         return
+    frame_locals = frame.f_locals
+    for name in names:
+        params[name][infer_type(frame_locals[name])] += 1
+    if trace_log is not None:
+        trace_log.recorded()
 
-    filename = frame.f_code.co_filename
-    func_name = frame.f_code.co_name
+def record_return(code: CodeType, value: Any) -> None:
+    if sampled(_return_counts, code):
+        traced_returns[code.co_filename][code.co_name][infer_type(value)] += 1
+        if trace_log is not None:
+            trace_log.recorded()
 
-    if filename.startswith(sys.prefix) or 'site-packages' in filename:
+# sys.setprofile backend: fires on every call and return in the process
+def tracefunc(frame: FrameType, event: str, arg: Any):
+    if event not in {"call", "return"}:
         return
 
-    if not os.path.exists(filename):
+    code = frame.f_code
+    names = traced_args(code)
+    if names is None:
         return
 
     if event == "call":
-        args_info = inspect.getargvalues(frame)
-        arg_values = [args_info.locals[arg] for arg in args_info.args]
-        traced_calls[filename][func_name].append(arg_values)
+        record_call(code, frame, names)
     elif event == "return":
-        traced_returns[filename][func_name].append(arg)
+        record_return(code, arg)
 
     return tracefunc
 
-sys.setprofile(tracefunc)
+# sys.monitoring backend (Python 3.12+, PEP 669): only PY_START, PY_RETURN and PY_YIELD
+# are enabled, and code outside the target tree is switched off after its first event.
+# Yielded values count as returns, as they do for the profile backend.
+def _on_start(code: CodeType, instruction_offset: int):
+    names = traced_args(code)
+    if names is None:
+        return sys.monitoring.DISABLE
+    record_call(code, sys._getframe(1), names)
+
+def _on_return(code: CodeType, instruction_offset: int, retval: Any):
+    if traced_args(code) is None:
+        return sys.monitoring.DISABLE
+    record_return(code, retval)
+
+def resolve_backend(backend: str = "auto") -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown tracing backend: {backend}")
+    if backend == "auto":
+        return "monitoring" if hasattr(sys, "monitoring") else "profile"
+    if backend == "monitoring" and not hasattr(sys, "monitoring"):
+        raise RuntimeError("The monitoring backend needs Python 3.12 or newer")
+    return backend
+
+def start_tracing(backend: str = "auto") -> str:
+    backend = resolve_backend(backend)
+    if backend == "monitoring":
+        monitoring = sys.monitoring
+        tool = monitoring.PROFILER_ID
+        monitoring.use_tool_id(tool, "righttyper")
+        monitoring.register_callback(tool, monitoring.events.PY_START, _on_start)
+        monitoring.register_callback(tool, monitoring.events.PY_RETURN, _on_return)
+        monitoring.register_callback(tool, monitoring.events.PY_YIELD, _on_return)
+        monitoring.set_events(tool, monitoring.events.PY_START | monitoring.events.PY_RETURN
+                              | monitoring.events.PY_YIELD)
+    else:
+        sys.setprofile(tracefunc)
+    return backend
+
+def stop_tracing(backend: str) -> None:
+    if backend == "monitoring":
+        monitoring = sys.monitoring
+        tool = monitoring.PROFILER_ID
+        monitoring.set_events(tool, monitoring.events.NO_EVENTS)
+        monitoring.register_callback(tool, monitoring.events.PY_START, None)
+        monitoring.register_callback(tool, monitoring.events.PY_RETURN, None)
+        monitoring.register_callback(tool, monitoring.events.PY_YIELD, None)
+        monitoring.free_tool_id(tool)
+        # Events disabled during this run stay disabled until restart_events().
+        monitoring.restart_events()
+    else:
+        sys.setprofile(None)
+
+def trace_script(input_file: str, script_args: list[str], backend: str = "auto") -> str:
+    """Runs input_file as __main__ under the tracer and returns the backend used."""
+    saved_argv = sys.argv
+    sys.argv = [input_file, *script_args]
+    backend = start_tracing(backend)
+    try:
+        runpy.run_path(input_file, run_name="__main__")
+    finally:
+        stop_tracing(backend)
+        sys.argv = saved_argv
+        capture_signatures()
+        if trace_log is not None:
+            trace_log.flush()
+    return backend
+
+def capture_signatures(release: bool = True) -> None:
+    """Records the signature of each traced function that its module defines by that name."""
+    for filename, module_globals in _module_globals.items():
+        signatures = traced_signatures[filename]
+        for func_name in traced_calls.get(filename, {}):
+            if func_name in signatures or func_name not in module_globals:
+                continue
+            func_obj = module_globals[func_name]
+            try:
+                sig = inspect.signature(func_obj)
+            except (TypeError, ValueError):
+                continue
+            signatures[func_name] = {
+                "name": getattr(func_obj, "__name__", func_name),
+                "signature": str(sig).replace("(<", "(").replace(">)", ")"),
+                "params": list(sig.parameters),
+            }
+    if release:
+        _module_globals.clear()
+
+# ---------- Multi-script runs ----------
+
+def reset_observations() -> None:
+    traced_calls.clear()
+    traced_returns.clear()
+    traced_signatures.clear()
+    _module_globals.clear()
+    _call_counts.clear()
+    _return_counts.clear()
+
+def observations() -> dict:
+    """Returns a picklable copy of the types observed so far."""
+    return {
+        "calls": {filename: {func_name: dict(params) for func_name, params in functions.items()}
+                  for filename, functions in traced_calls.items()},
+        "returns": {filename: dict(functions) for filename, functions in traced_returns.items()},
+        "signatures": dict(traced_signatures),
+    }
+
+def merge_observations(observed: dict) -> None:
+    for filename, functions in observed["calls"].items():
+        for func_name, params in functions.items():
+            merged = traced_calls[filename][func_name]
+            for name, types in params.items():
+                merged[name].update(types)
+    for filename, functions in observed["returns"].items():
+        for func_name, types in functions.items():
+            traced_returns[filename][func_name].update(types)
+    for filename, signatures in observed["signatures"].items():
+        for func_name, signature in signatures.items():
+            traced_signatures[filename].setdefault(func_name, signature)
+
+def covered_functions(observed: dict) -> set[str]:
+    return {f"{filename}:{func_name}"
+            for filename, functions in observed["calls"].items()
+            for func_name in functions if not func_name.startswith("<")}
+
+def trace_worker(input_file: str, script_args: list[str], backend: str, sampling: tuple[int, int],
+                 trace_log_path: str = None, session: str = None) -> tuple[dict, list[str], Union[str, None]]:
+    """Traces one run of an entry script, answering input() from session if given.
+
+    Returns what was observed, the traced functions the run called, and an
+    error message if it failed: failures are returned, not raised.
+    """
+    set_sampling(*sampling)
+    reset_observations()
+    if trace_log_path:
+        start_trace_log(trace_log_path)
+    # Workers are reused: forget the modules this script imported so the next
+    # script imports (and traces) them afresh instead of sharing their state.
+    loaded = set(sys.modules)
+    answers = None
+    error = None
+    try:
+        with scripted_input(read_session(session)) if session else nullcontext() as answers:
+            trace_script(input_file, script_args, backend)
+    except SystemExit:
+        pass
+    except EOFError as e:
+        # Running out of scripted answers ends a session like EOF on stdin would
+        if answers is None or not answers.exhausted:
+            error = f"EOFError: {e}"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        for name in set(sys.modules) - loaded:
+            del sys.modules[name]
+        observed = observations()
+        covered = covered_functions(observed)
+        if trace_log_path:
+            covered |= trace_log.covered
+            stop_trace_log()
+    return observed, sorted(covered), error
+
+def trace_scripts(input_files: list[str], backend: str = "auto", jobs: int = None,
+                  trace_log_path: str = None, sessions: list[str] = None,
+                  script_args: list[str] = ()) -> list[tuple[str, Union[str, None], list[str], Union[str, None]]]:
+    """Traces each script, once per session if given, and merges what the runs observed.
+
+    Runs go to a process pool, or run one after another in this process when
+    jobs is 1. Results are merged in input order, so the report does not depend
+    on which worker finishes first. With trace_log_path, runs append to that log
+    instead and nothing is merged. Returns (script, session, covered functions,
+    error) for each run.
+    """
+    runs = [(input_file, session) for input_file in input_files for session in (sessions or [None])]
+    outcomes = trace_runs(runs, backend, jobs, trace_log_path, script_args)
+
+    results = []
+    for (input_file, session), (observed, covered, error) in zip(runs, outcomes):
+        merge_observations(observed)
+        results.append((input_file, session, covered, error))
+    return results
+
+def trace_runs(runs: list[tuple[str, Union[str, None]]], backend: str = "auto", jobs: int = None,
+               trace_log_path: str = None, script_args: list[str] = ()) -> list[tuple[dict, list[str], Union[str, None]]]:
+    """Runs trace_worker for each (script, session) and returns its outcomes in order, unmerged."""
+    resolve_backend(backend)
+    if not runs:
+        return []
+    workers = min(jobs or os.cpu_count() or 1, len(runs))
+    args = (
+        [input_file for input_file, _ in runs],
+        repeat(list(script_args)),
+        repeat(backend),
+        repeat((sample_first, sample_every)),
+        repeat(trace_log_path),
+        [session for _, session in runs],
+    )
+    if workers == 1:
+        outcomes = list(map(trace_worker, *args))
+        reset_observations()
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(trace_worker, *args))
+    return outcomes
+
+def print_results(results: list, sessions: bool) -> None:
+    seen = set()
+    for input_file, session, covered, error in results:
+        run = f"{input_file} < {session}" if session else input_file
+        if error:
+            print(f"[!] {run} failed: {error}")
+        if sessions:
+            new = len(set(covered) - seen)
+            seen.update(covered)
+            print(f"[+] {run}: {len(covered)} traced functions called, {new} not called before")
+    if sessions:
+        print(f"[+] Coverage: {len(seen)} traced functions over {len(results)} sessions")
+
+# ---------- Scripted Input ----------
+
+class ScriptedInput:
+    """Stands in for builtins.input, answering each prompt with the next scripted line."""
+
+    def __init__(self, lines: list[str]):
+        self.lines = iter(lines)
+        self.exhausted = False
+
+    def __call__(self, prompt: str = "") -> str:
+        try:
+            return next(self.lines)
+        except StopIteration:
+            self.exhausted = True
+            raise EOFError("scripted input exhausted") from None
+
+@contextmanager
+def scripted_input(lines: list[str]):
+    saved_input = builtins.input
+    answers = builtins.input = ScriptedInput(lines)
+    try:
+        yield answers
+    finally:
+        builtins.input = saved_input
+
+def read_session(path: str) -> list[str]:
+    with open(path) as f:
+        return f.read().splitlines()
+
+def session_files(paths: list[str]) -> list[str]:
+    """Expands directories in paths to the files directly inside them, in name order."""
+    sessions = []
+    for path in paths:
+        if os.path.isdir(path):
+            sessions.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                   if os.path.isfile(os.path.join(path, name))))
+        else:
+            sessions.append(path)
+    return sessions
+
+# ---------- Trace Logs ----------
+
+# Observations recorded between two writes to the trace log
+FLUSH_EVERY = 10000
+
+class TraceLog:
+    """Streams observations to an append-only JSONL file while the target runs.
+
+    Every FLUSH_EVERY recorded events the counters are written out as one line,
+    in the same shape as observations(), and reset. Each batch goes out in a
+    single write to a file opened for appending, so several processes can share
+    one log, and a run that dies loses at most one batch.
+    """
+
+    def __init__(self, path: str, flush_every: int = None):
+        self.path = path
+        self.flush_every = flush_every or FLUSH_EVERY
+        self.pending = 0
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._logged_signatures: set[tuple[str, str]] = set()
+        self.covered: set[str] = set()
+
+    def recorded(self) -> None:
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        capture_signatures(release=False)
+        batch = observations()
+        self.covered |= covered_functions(batch)
+        signatures = {}
+        for filename, functions in batch["signatures"].items():
+            for func_name, signature in functions.items():
+                if (filename, func_name) not in self._logged_signatures:
+                    self._logged_signatures.add((filename, func_name))
+                    signatures.setdefault(filename, {})[func_name] = signature
+        batch["signatures"] = signatures
+        if any(batch.values()):
+            os.write(self.fd, (json.dumps(batch, separators=(",", ":")) + "\n").encode())
+        traced_calls.clear()
+        traced_returns.clear()
+        traced_signatures.clear()
+        self.pending = 0
 
-# Run target file interactively
-input_file = sys.argv[1]
-input_basename = os.path.splitext(os.path.basename(input_file))[0]  # <-- Extract name for file output
-sys.argv = sys.argv[1:]
-runpy.run_path(input_file, run_name="__main__")
+    def close(self) -> None:
+        self.flush()
+        os.close(self.fd)
 
-sys.setprofile(None)
+trace_log: Union[TraceLog, None] = None
+
+def start_trace_log(path: str) -> None:
+    global trace_log
+    trace_log = TraceLog(path)
+
+def stop_trace_log() -> None:
+    global trace_log
+    trace_log.close()
+    trace_log = None
+
+def analyze(trace_logs: list[str]) -> None:
+    """Folds trace logs into the observation tables, ready for build_report()."""
+    for path in trace_logs:
+        with open(path) as f:
+            for line in f:
+                try:
+                    batch = json.loads(line)
+                except json.JSONDecodeError:
+                    # A batch cut short by a crash
+                    continue
+                merge_observations(batch)
 
 # ---------- Type Inference Helpers ----------
 
-def merge_types(types: list[str]) -> str:
-    types = list(set(types))
-    if len(types) == 1:
-        return types[0]
-    return f"Union[{', '.join(sorted(types))}]"
-
-def infer_type(value: Any) -> str:
-    if value is None:
-        return "None"
-    elif isinstance(value, bool):
-        return "bool"
-    elif isinstance(value, int):
-        return "int"
-    elif isinstance(value, float):
-        return "float"
-    elif isinstance(value, str):
-        return "str"
-    elif isinstance(value, list):
-        if not value:
-            return "list[Any]"
-        inner_types = [infer_type(v) for v in value]
-        return f"list[{merge_types(inner_types)}]"
-    elif isinstance(value, dict):
-        if not value:
-            return "dict[Any, Any]"
-        ktypes = [infer_type(k) for k in value.keys()]
-        vtypes = [infer_type(v) for v in value.values()]
-        return f"dict[{merge_types(ktypes)}, {merge_types(vtypes)}]"
-    return "Any"
-
-def build_signature(func: Any, args_examples: list[list[Any]], return_values: list[Any]) -> str:
-    sig = inspect.signature(func)
+infer_type = TypeInferer()
+
+def infer_signature_types(signature: dict, param_types: dict[str, Counter],
+                          return_types: Counter) -> tuple[list[tuple[str, str]], str]:
     params = []
 
-    for i, (name, param) in enumerate(sig.parameters.items()):
-        values = [args[i] for args in args_examples if len(args) > i]
-        if values:
-            param_type = merge_types([infer_type(v) for v in values])
+    for name in signature["params"]:
+        types = param_types.get(name)
+        if types:
+            param_type = merge_types(list(types))
         else:
             param_type = "Any"
-        params.append(f"{name}: {param_type}")
+        params.append((name, param_type))
 
-    if return_values:
-        return_type = merge_types([infer_type(rv) for rv in return_values])
+    if return_types:
+        return_type = merge_types(list(return_types))
     else:
         return_type = "Any"
 
-    return f"def {func.__name__}({', '.join(params)}) -> {return_type}:", sig
+    return params, return_type
 
-# ---------- Report Generation ----------
+def build_signature(signature: dict, param_types: dict[str, Counter], return_types: Counter) -> str:
+    params, return_type = infer_signature_types(signature, param_types, return_types)
+    return f"def {signature['name']}({', '.join(f'{name}: {param_type}' for name, param_type in params)}) -> {return_type}:"
 
-out_lines = []
+def inferred_signatures():
+    """Yields (file, function, signature, parameter types, return type) for each traced function."""
+    for filepath, functions in traced_calls.items():
+        signatures = traced_signatures.get(filepath, {})
+        for func_name, param_types in functions.items():
+            signature = signatures.get(func_name)
+            if signature is None:
+                continue
+            params, return_type = infer_signature_types(
+                signature,
+                param_types,
+                traced_returns[filepath].get(func_name, Counter())
+            )
+            yield filepath, func_name, signature, params, return_type
 
-for filepath, functions in traced_calls.items():
-    out_lines.append(f"{filepath}:")
-    out_lines.append("=" * 42)
-    out_lines.append("")
+# ---------- Report Generation ----------
 
-    with open(filepath) as f:
-        source = f.read()
-        tree = ast.parse(source)
+def build_report() -> list[str]:
+    out_lines = []
 
-    func_defs = {node.name: node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)}
-    module_globals = {}
-    exec(compile(tree, filepath, "exec"), module_globals)
+    for filepath, functions in traced_calls.items():
+        out_lines.append(f"{filepath}:")
+        out_lines.append("=" * 42)
+        out_lines.append("")
 
-    for func_name, args_list in functions.items():
-        if func_name not in module_globals:
-            continue
+        signatures = traced_signatures.get(filepath, {})
 
-        func_obj = module_globals[func_name]
-        new_sig, old_sig = build_signature(
-            func_obj,
-            args_list,
-            traced_returns[filepath].get(func_name, [])
-        )
+        for func_name, param_types in functions.items():
+            signature = signatures.get(func_name)
+            if signature is None:
+                continue
 
-        old_sig_str = str(old_sig).replace("(<", "(").replace(">)", ")")
+            new_sig = build_signature(
+                signature,
+                param_types,
+                traced_returns[filepath].get(func_name, Counter())
+            )
+            old_sig_str = signature["signature"]
 
-        out_lines.append(func_name)
-        out_lines.append("")
-        out_lines.append("  # Inferred type signature")
-        out_lines.append(f"- def {func_name}{old_sig_str}:")
-        out_lines.append(f"+ {new_sig}")
-        out_lines.append("")
+            out_lines.append(func_name)
+            out_lines.append("")
+            out_lines.append("  # Inferred type signature")
+            out_lines.append(f"- def {func_name}{old_sig_str}:")
+            out_lines.append(f"+ {new_sig}")
+            out_lines.append("")
+
+    return out_lines
 
 # ---------- Save Report to <inputfilename>_righttyper.out ----------
 
-output_file = f"{input_basename}_righttyper.out"
-with open(output_file, "w") as f:
-    f.write("\n".join(out_lines))
+def report_path(input_file: str) -> str:
+    input_basename = os.path.splitext(os.path.basename(input_file))[0]
+    return f"{input_basename}_righttyper.out"
+
+def report_records():
+    """Rows of the combined report for the signatures inferred so far, as in build_report()."""
+    for filepath, func_name, signature, params, return_type in inferred_signatures():
+        yield from generate_csv.righttyper_rows(os.path.basename(filepath), func_name, params, return_type)
+
+def write_report(out_lines: list[str], output_file: str) -> str:
+    """Writes the report, and its JSONL records next to it."""
+    with open(output_file, "w") as f:
+        f.write("\n".join(out_lines))
+    generate_csv.write_records(generate_csv.records_path(output_file), report_records())
+    return output_file
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Infer type signatures by tracing a script at runtime.")
+    parser.add_argument("--backend", choices=BACKENDS, default="auto",
+                        help="sys.monitoring on Python 3.12+ (auto), or the sys.setprofile fallback")
+    parser.add_argument("--sample-first", type=int, default=0, metavar="N",
+                        help="Record every call of a function up to N before sampling")
+    parser.add_argument("--sample-every", type=int, default=1, metavar="K",
+                        help="After the first N calls, record one call in K (default: all)")
+    parser.add_argument("--each", action="store_true",
+                        help="Treat every positional argument as an entry script and trace them in parallel")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Worker processes for --each and --inputs (default: CPU count, 1 runs in-process)")
+    parser.add_argument("--inputs", action="append", default=None, metavar="SESSION",
+                        help="Run each script once per session file (or directory of session files), "
+                             "answering input() from its lines; may be repeated")
+    parser.add_argument("--trace-log", default=None, metavar="FILE",
+                        help="Append observations to a JSONL trace log instead of writing a report")
+    parser.add_argument("--analyze", action="store_true",
+                        help="Treat every positional argument as a trace log and fold them into one report")
+    parser.add_argument("-o", "--output", default=None,
+                        help=f"Report file (default: <script>_righttyper.out, or {MERGED_REPORT} with --each)")
+    parser.add_argument("script", help="Entry script, run as __main__ (or a trace log with --analyze)")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments passed to the script")
+    return parser
+
+def main(argv: list[str] = None) -> None:
+    parser = build_parser()
+    options = parser.parse_args(argv)
+    try:
+        set_sampling(options.sample_first, options.sample_every)
+    except ValueError as e:
+        parser.error(str(e))
+    if options.analyze:
+        analyze([options.script, *options.args])
+        output_file = write_report(build_report(), options.output or MERGED_REPORT)
+    elif options.each or options.inputs:
+        if options.each:
+            scripts, script_args, default_output = [options.script, *options.args], [], MERGED_REPORT
+        else:
+            scripts, script_args, default_output = [options.script], options.args, report_path(options.script)
+        sessions = session_files(options.inputs) if options.inputs else None
+        results = trace_scripts(scripts, options.backend, options.jobs, options.trace_log, sessions, script_args)
+        print_results(results, sessions is not None)
+        output_file = options.trace_log or write_report(build_report(), options.output or default_output)
+    elif options.trace_log:
+        start_trace_log(options.trace_log)
+        try:
+            trace_script(options.script, options.args, options.backend)
+        finally:
+            stop_trace_log()
+        output_file = options.trace_log
+    else:
+        # Run target file interactively
+        trace_script(options.script, options.args, options.backend)
+        output_file = write_report(build_report(), options.output or report_path(options.script))
+    print(f"[+] All done! Output saved to {output_file}")
 
-print(f"[+] All done! Output saved to {output_file}")
+if __name__ == "__main__":
+    main()
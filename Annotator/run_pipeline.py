@@ -1,14 +1,59 @@
 # run_pipeline.py
 
-import subprocess
-
-def main():
-    print("🚀 Starting annotation pipeline using Taskfile...")
-    try:
-        subprocess.run(["task", "run_all"], check=True)
-    except FileNotFoundError:
-        print("❌ Taskfile not found or 'task' CLI tool is not installed.")
-    except subprocess.CalledProcessError:
-        print("❌ Taskfile execution failed.")
-    else:
-        print("✅ Annotation pipeline completed successfully!")
+import argparse
+import os
+from analysis_cache import AnalysisCache, DEFAULT_PATH as DEFAULT_CACHE
+from annotation_engine import AnnotationEngine, find_sources
+from generate_csv import FINAL_REPORT
+from righttyper import session_files
+
+DEFAULT_SOURCES = "testcases"
+DEFAULT_SESSIONS = os.path.join("testcases", "sessions")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run all annotators in one process and write the combined report.")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_SOURCES], help="Files or directories to annotate")
+    parser.add_argument("--inputs", action="append", default=None, metavar="SESSION",
+                        help=f"Scripted input sessions for the traced scripts (default: {DEFAULT_SESSIONS} if present)")
+    parser.add_argument("--static-only", action="store_true", help="Skip the runtime annotators")
+    parser.add_argument("--intermediates", action="store_true",
+                        help="Also write each annotator's own report file")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes for tracing")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, metavar="PATH",
+                        help=f"Analysis cache: unchanged files are not analyzed again (default: {DEFAULT_CACHE})")
+    parser.add_argument("--no-cache", dest="cache", action="store_const", const=None,
+                        help="Analyze every file, without reading or updating the cache")
+    parser.add_argument("--sort", action="store_true",
+                        help="Sort rows by module, function and variable and drop duplicate rows")
+    parser.add_argument("-o", "--output", default=FINAL_REPORT, help="Combined report file")
+    return parser
+
+def main(argv=None):
+    options = build_parser().parse_args(argv)
+    print("🚀 Starting annotation pipeline...")
+    sources = find_sources(options.paths)
+    if not sources:
+        print("❌ No Python files found to annotate.")
+        return
+
+    cache = AnalysisCache(options.cache) if options.cache else None
+    engine = AnnotationEngine(sources, cache)
+    print("📘 Running static annotators...")
+    engine.run_static()
+    if not options.static_only:
+        sessions = options.inputs
+        if sessions is None and os.path.isdir(DEFAULT_SESSIONS):
+            sessions = [DEFAULT_SESSIONS]
+        print("📦 Running runtime annotators...")
+        engine.run_runtime(session_files(sessions) if sessions else None, options.jobs)
+    if options.intermediates:
+        engine.write_intermediates()
+    engine.write_report(options.output, options.sort)
+    if cache is not None:
+        cache.save()
+        print(f"[+] Analysis cache: {cache.stats['hits']} results reused, {cache.stats['misses']} analyzed")
+        cache.close()
+    print(f"✅ Annotation pipeline completed successfully! Report: {options.output}")
+
+if __name__ == "__main__":
+    main()
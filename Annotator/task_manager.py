@@ -1,68 +1,181 @@
 # task_manager.py
 
+import csv
 import json
 import os
-from datetime import datetime
+import sys
 from typing import Any
+import task_store
 
 TASKS_FILE = "tasks.json"
+TASKS_DB = "tasks.db"
+TASK_FIELDS = ["description", "due_date", "category"]
+EXPORT_FIELDS = ["id", "description", "due_date", "category"]
+FILE_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
 
-# Load tasks from file
+# Open the store picked by $TASK_STORE_BACKEND (JSON file by default)
+def get_store() -> task_store.TaskStore:
+    backend = task_store.default_backend()
+    return task_store.get_store(TASKS_DB if backend == "sqlite" else TASKS_FILE, backend)
+
+# Load tasks from the store
 def load_tasks() -> Any:
-    if os.path.exists(TASKS_FILE):
-        with open(TASKS_FILE, "r") as file:
-            return json.load(file)
-    return []
+    return get_store().load()
 
-# Save tasks to file
-def save_tasks(tasks) -> None:
-    with open(TASKS_FILE, "w") as file:
-        json.dump(tasks, file, indent=4)
+# Load tasks together with the store version they were read at
+def load_tasks_versioned() -> tuple:
+    return get_store().load_versioned()
 
-# Add a new task
-def add_task(description, due_date, category) -> str:
-    tasks = load_tasks()
-    new_task = {
-        "id": len(tasks) + 1,
+# Replace all tasks in the store. Pass the version from load_tasks_versioned
+# to get task_store.VersionConflict instead of overwriting a concurrent change.
+def save_tasks(tasks, expected_version=None) -> None:
+    get_store().replace(tasks, expected_version)
+
+# Build a new task record, raising ValueError for an unparseable due date
+def new_task(description, due_date, category) -> dict:
+    try:
+        ordinal = task_store.due_ordinal(due_date)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid due date {due_date!r}, please use YYYY-MM-DD.")
+    return {
         "description": description,
         "due_date": due_date,
-        "category": category
+        "category": category,
+        "due_ordinal": ordinal
     }
-    tasks.append(new_task)
-    save_tasks(tasks)
+
+# Store a new task and return it with its assigned id
+def create_task(description, due_date, category) -> dict:
+    return get_store().add(new_task(description, due_date, category))
+
+# Add a new task
+def add_task(description, due_date, category) -> str:
+    try:
+        create_task(description, due_date, category)
+    except ValueError:
+        return "\nInvalid due date, please use YYYY-MM-DD."
     return "\nTask added successfully!"
 
-# List tasks sorted by due date
+# Validate a stream of task rows and commit them all in one store write.
+# Nothing is stored if any row is invalid.
+def add_tasks_bulk(rows) -> int:
+    tasks = []
+    for row_number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            raise ValueError(f"Row {row_number}: expected an object")
+        missing = [field for field in TASK_FIELDS if not isinstance(row.get(field), str)]
+        if missing:
+            raise ValueError(f"Row {row_number}: missing {', '.join(missing)}")
+        try:
+            tasks.append(new_task(row["description"], row["due_date"], row["category"]))
+        except ValueError as e:
+            raise ValueError(f"Row {row_number}: {e}")
+    if tasks:
+        get_store().add_many(tasks)
+    return len(tasks)
+
+# Pick csv or jsonl from an explicit choice or the file extension;
+# stdin/stdout ("-") default to jsonl
+def file_format(path, fmt=None) -> str:
+    if fmt:
+        return fmt
+    if path == "-":
+        return "jsonl"
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FILE_FORMATS:
+        raise ValueError(f"Cannot tell the format of {path}; use --format csv or --format jsonl.")
+    return FILE_FORMATS[ext]
+
+# Stream task rows from a CSV (with a header) or JSONL file; "-" reads stdin
+def read_task_rows(path, fmt=None):
+    fmt = file_format(path, fmt)
+    file = sys.stdin if path == "-" else open(path, "r", newline="")
+    try:
+        if fmt == "csv":
+            yield from csv.DictReader(file)
+        else:
+            # Rows are numbered as add_tasks_bulk numbers them: blank lines don't count
+            lines = (line for line in file if line.strip())
+            for row_number, line in enumerate(lines, start=1):
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Row {row_number}: {e}")
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+# Import tasks from a CSV or JSONL file in a single commit
+def import_tasks(path, fmt=None) -> int:
+    return add_tasks_bulk(read_task_rows(path, fmt))
+
+# Stream tasks to a CSV or JSONL file; "-" writes stdout. Filters as in iter_tasks.
+def export_tasks(path, fmt=None, **filters) -> int:
+    fmt = file_format(path, fmt)
+    file = sys.stdout if path == "-" else open(path, "w", newline="")
+    exported = 0
+    try:
+        if fmt == "csv":
+            writer = csv.writer(file)
+            writer.writerow(EXPORT_FIELDS)
+            for task in iter_tasks(**filters):
+                writer.writerow([task[field] for field in EXPORT_FIELDS])
+                exported += 1
+        else:
+            for task in iter_tasks(**filters):
+                file.write(json.dumps({field: task[field] for field in EXPORT_FIELDS}) + "\n")
+                exported += 1
+    finally:
+        if file is not sys.stdout:
+            file.close()
+    return exported
+
+# Stream tasks in due date order, optionally filtered by category and an
+# exclusive due date range, and paged with offset/limit
+def iter_tasks(category=None, due_before=None, due_after=None, offset=0, limit=None):
+    # Checked before iterating starts; backends disagree on negative values
+    if offset < 0:
+        raise ValueError(f"Invalid offset {offset}, must not be negative.")
+    if limit is not None and limit < 0:
+        raise ValueError(f"Invalid limit {limit}, must not be negative.")
+    return get_store().iter_tasks(
+        category=category,
+        due_after=None if due_after is None else task_store.due_ordinal(due_after),
+        due_before=None if due_before is None else task_store.due_ordinal(due_before),
+        offset=offset,
+        limit=limit,
+    )
+
+# List tasks in due date order, walking the store's pre-sorted index
 def list_tasks() -> str:
-    tasks = load_tasks()
-    if not tasks:
+    table = [[task["id"], task["description"], task["due_date"], task["category"]]
+             for task in iter_tasks()]
+    if not table:
         return "\nNo tasks found."
-    
-    tasks.sort(key=lambda x: datetime.strptime(x["due_date"], "%Y-%m-%d"))
-    
-    table = [[task["id"], task["description"], task["due_date"], task["category"]] for task in tasks]
     return table
 
+# Delete a task by ID, returning False when it does not exist
+def remove_task(task_id) -> bool:
+    return get_store().delete(task_id)
+
 # Flush a specific task by ID
 def flush_task(task_id) -> str:
-    tasks = load_tasks()
-    tasks = [task for task in tasks if task["id"] != task_id]
-    
-    for i, task in enumerate(tasks):
-        task["id"] = i + 1
-
-    save_tasks(tasks)
+    if not remove_task(task_id):
+        return "\nTask not found."
     return "\nTask removed successfully!"
 
 # Flush all tasks from the database
 def flush_all_tasks() -> str:
-    tasks = load_tasks()
-    if not tasks:
+    if not get_store().count():
         return "\nNo tasks found to delete."
     
     return "This will delete all tasks from the database. Do you want to proceed? (Yes/No)"
 
 # Delete all tasks
 def delete_all_tasks() -> str:
-    save_tasks([])
+    get_store().clear()
     return "All tasks successfully deleted."
+
+# Cache hit/miss counters for the task store
+def cache_stats() -> dict:
+    return task_store.cache_stats()
@@ -0,0 +1,938 @@
+# task_store.py
+
+import argparse
+import bisect
+import json
+import os
+import re
+import sqlite3
+import struct
+import sys
+import threading
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import accumulate
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+BACKEND_ENV = "TASK_STORE_BACKEND"
+DEFAULT_BACKEND = "json"
+FORMAT_ENV = "TASK_STORE_FORMAT"
+DEFAULT_FORMAT = "json"
+SNAPSHOT_FORMAT = "task-journal"
+JOURNAL_SUFFIX = ".journal"
+ROTATED_SUFFIX = ".journal.1"
+LOCK_SUFFIX = ".lock"
+COMPACT_LOCK_SUFFIX = ".compact.lock"
+COMPACT_THRESHOLD = 1000  # journal records before a background compaction
+DATE_FORMAT = "%Y-%m-%d"
+UNPARSEABLE_DUE = 10 ** 7  # sorts after date.max.toordinal() (3652059)
+
+# Parse a YYYY-MM-DD due date into a proleptic Gregorian ordinal
+def due_ordinal(due_date: str) -> int:
+    return datetime.strptime(due_date, DATE_FORMAT).toordinal()
+
+# Fill in due_ordinal for tasks written before it was stored with each task
+def _ensure_due_ordinal(task: dict) -> int:
+    ordinal = task.get("due_ordinal")
+    if ordinal is None:
+        try:
+            ordinal = due_ordinal(task["due_date"])
+        except (TypeError, ValueError):
+            ordinal = UNPARSEABLE_DUE
+        task["due_ordinal"] = ordinal
+    return ordinal
+
+
+# Snapshot serializers.
+#
+# A snapshot is {"seq", "next_id", "tasks"}. Both formats put seq in the
+# first few bytes so other processes can check it without a full parse, and
+# load_snapshot() picks the format from those bytes, so a store can switch
+# formats (via $TASK_STORE_FORMAT) and still read what was written before.
+class JsonSerializer:
+    name = "json"
+    SEQ_PATTERN = re.compile(rb'\{"format":"%s","seq":(\d+)' % SNAPSHOT_FORMAT.encode())
+    LEGACY_SEQ_PATTERN = re.compile(rb'\{"format": "%s", "seq": (\d+)' % SNAPSHOT_FORMAT.encode())
+
+    def matches(self, head: bytes) -> bool:
+        return head.lstrip()[:1] in (b"{", b"[")
+
+    def dump(self, snapshot: dict, file) -> None:
+        # No indentation or padding: about half the bytes of indent=4.
+        data = {"format": SNAPSHOT_FORMAT, "seq": snapshot["seq"], "next_id": snapshot["next_id"],
+                "tasks": snapshot["tasks"]}
+        file.write(json.dumps(data, separators=(",", ":")).encode())
+
+    def load(self, data: bytes):
+        return json.loads(data)
+
+    def peek_seq(self, head: bytes):
+        match = self.SEQ_PATTERN.match(head) or self.LEGACY_SEQ_PATTERN.match(head)
+        return int(match.group(1)) if match else None
+
+
+# Column-oriented binary layout, stdlib only:
+#
+#   header   struct "<4sBQQI": magic, version, seq, next_id, task count
+#   ids      int64 x count
+#   ordinals int64 x count (due_ordinal)
+#   then for description, due_date and category:
+#            uint32 x count character lengths, uint64 byte length, UTF-8 text
+#
+# Each column is read with one array.frombytes or one decode, and the task
+# dicts are rebuilt in a single comprehension. Only the five task fields are
+# stored, and the three text fields must be strings.
+class BinarySerializer:
+    name = "binary"
+    MAGIC = b"TSKB"
+    VERSION = 1
+    HEADER = struct.Struct("<4sBQQI")
+    TEXT_FIELDS = ("description", "due_date", "category")
+
+    def matches(self, head: bytes) -> bool:
+        return head.startswith(self.MAGIC)
+
+    def dump(self, snapshot: dict, file) -> None:
+        tasks = snapshot["tasks"]
+        file.write(self.HEADER.pack(self.MAGIC, self.VERSION, snapshot["seq"], snapshot["next_id"], len(tasks)))
+        file.write(_little_endian(array("q", [task["id"] for task in tasks])).tobytes())
+        file.write(_little_endian(array("q", [_ensure_due_ordinal(task) for task in tasks])).tobytes())
+        for field in self.TEXT_FIELDS:
+            values = [task[field] for task in tasks]
+            if not all(isinstance(value, str) for value in values):
+                raise ValueError(f"The binary snapshot format needs string {field} values")
+            text = "".join(values).encode("utf-8")
+            file.write(_little_endian(array("I", [len(value) for value in values])).tobytes())
+            file.write(struct.pack("<Q", len(text)))
+            file.write(text)
+
+    def load(self, data: bytes) -> dict:
+        view = memoryview(data)
+        magic, version, seq, next_id, count = self.HEADER.unpack_from(view)
+        if version != self.VERSION:
+            raise ValueError(f"Unsupported binary snapshot version {version}")
+        offset = self.HEADER.size
+        ids, offset = _read_array("q", view, offset, count)
+        ordinals, offset = _read_array("q", view, offset, count)
+        columns = []
+        for _ in self.TEXT_FIELDS:
+            lengths, offset = _read_array("I", view, offset, count)
+            (size,) = struct.unpack_from("<Q", view, offset)
+            offset += 8
+            text = bytes(view[offset:offset + size]).decode("utf-8")
+            offset += size
+            ends = list(accumulate(lengths))
+            columns.append([text[end - length:end] for end, length in zip(ends, lengths)])
+        descriptions, due_dates, categories = columns
+        tasks = [
+            {"id": task_id, "description": description, "due_date": due_date,
+             "category": category, "due_ordinal": ordinal}
+            for task_id, description, due_date, category, ordinal
+            in zip(ids, descriptions, due_dates, categories, ordinals)
+        ]
+        return {"seq": seq, "next_id": next_id, "tasks": tasks}
+
+    def peek_seq(self, head: bytes):
+        if len(head) < self.HEADER.size:
+            return None
+        return self.HEADER.unpack_from(head)[2]
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+def _read_array(typecode: str, view: memoryview, offset: int, count: int) -> tuple:
+    values = array(typecode)
+    end = offset + values.itemsize * count
+    values.frombytes(view[offset:end])
+    return _little_endian(values), end
+
+
+SERIALIZERS = {
+    "json": JsonSerializer(),
+    "binary": BinarySerializer(),
+}
+
+# Snapshot format named by $TASK_STORE_FORMAT, compact JSON when unset
+def default_serializer():
+    name = os.environ.get(FORMAT_ENV, DEFAULT_FORMAT)
+    if name not in SERIALIZERS:
+        raise ValueError(f"Unknown task store format: {name} (expected one of {', '.join(SERIALIZERS)})")
+    return SERIALIZERS[name]
+
+# Serializer that wrote a snapshot, from its first bytes
+def detect_serializer(head: bytes):
+    for serializer in SERIALIZERS.values():
+        if serializer.matches(head):
+            return serializer
+    raise ValueError("Unrecognised task snapshot format")
+
+
+# Interface shared by the storage backends behind task_manager
+class TaskStore:
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def load(self) -> list:
+        raise NotImplementedError
+
+    def load_versioned(self) -> tuple:
+        """Returns (tasks, version) read atomically, for a later replace(..., expected_version)."""
+        raise NotImplementedError
+
+    def version(self) -> int:
+        """A counter that moves on every committed mutation."""
+        raise NotImplementedError
+
+    def iter_tasks(self, category=None, due_after=None, due_before=None, offset=0, limit=None):
+        """Yields tasks ordered by (due_ordinal, id), optionally filtered and paged.
+
+        due_after and due_before are exclusive due_ordinal bounds.
+        """
+        raise NotImplementedError
+
+    def add(self, task: dict) -> dict:
+        """Stores a new task under the next id from the store's counter and returns it."""
+        raise NotImplementedError
+
+    def add_many(self, tasks: list) -> list:
+        """Stores a batch of new tasks in a single write and returns them with their ids."""
+        raise NotImplementedError
+
+    def delete(self, task_id: int) -> bool:
+        """Deletes one task by id, returning False when no such task exists."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def replace(self, tasks: list, expected_version: int = None) -> None:
+        """Replaces every task; raises VersionConflict if expected_version is stale."""
+        raise NotImplementedError
+
+    def cache_stats(self) -> dict:
+        return {"hits": 0, "misses": 0}
+
+    def close(self) -> None:
+        pass
+
+
+# Raised when the store moved past the version a caller read before writing
+class VersionConflict(Exception):
+    pass
+
+
+# Advisory flock(2) lock on a side file. Re-entrant for the thread holding
+# it, so a mutation that triggers a compaction does not deadlock on itself.
+# Without fcntl (Windows) it only orders threads within this process.
+class _FileLock:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a+b")
+        self._depth = 0
+        self._exclusive = False
+
+    def acquire(self, exclusive: bool = True, blocking: bool = True) -> bool:
+        if self._depth:
+            if exclusive and not self._exclusive:
+                raise RuntimeError(f"Cannot upgrade a shared lock on {self.path}")
+            self._depth += 1
+            return True
+        if fcntl is not None:
+            flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            if not blocking:
+                flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(self._file.fileno(), flags)
+            except BlockingIOError:
+                return False
+        self._depth = 1
+        self._exclusive = exclusive
+        return True
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0 and fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    @contextmanager
+    def hold(self, exclusive: bool = True):
+        self.acquire(exclusive)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self._file.close()  # also drops any flock held through this file
+
+
+# Journaled task store (the default "json" backend).
+#
+# The snapshot file (tasks.json) holds the full task list together with the
+# sequence number of the last journal record folded into it and the next
+# task id to hand out. Every mutation is appended to <snapshot>.journal as
+# one JSON line, so adding a task costs one small write instead of
+# re-serializing the whole list. Opening the store loads the snapshot and
+# replays the journal on top of it; records whose seq is already covered by
+# the snapshot are skipped, which makes replay safe after a crash in the
+# middle of a compaction.
+#
+# Several processes can share one store. Reads hold a shared flock on
+# <snapshot>.lock and mutations an exclusive one, catching up on records
+# other processes appended before writing their own, so the journal's seq
+# numbers form a single history. Snapshots are written to a temp file and
+# moved into place with os.replace. A second lock, <snapshot>.compact.lock,
+# is held for the whole of a compaction so only one runs at a time.
+class JournalStore(TaskStore):
+    def __init__(self, path: str, compact_threshold: int = None, serializer=None):
+        self.path = path
+        self.serializer = serializer or default_serializer()
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.rotated_path = path + ROTATED_SUFFIX
+        self.lock_path = path + LOCK_SUFFIX
+        self.compact_lock_path = path + COMPACT_LOCK_SUFFIX
+        self.compact_threshold = compact_threshold or COMPACT_THRESHOLD
+        self.tasks = {}  # id -> task, in insertion order
+        self.next_id = 1
+        self._due_index = []  # sorted (due_ordinal, id) pairs
+        self._category_index = {}  # category -> sorted (due_ordinal, id) pairs
+        self.seq = 0
+        self.journal_records = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._file_lock = _FileLock(self.lock_path)
+        self._compactor = None
+        self._journal = None
+        with self._lock, self._file_lock.hold(exclusive=False):
+            self._open()
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        with self._lock, self._file_lock.hold(exclusive):
+            self._refresh()
+            if exclusive:
+                self._prepare_write()
+            yield
+
+    # ---------- Opening and replay ----------
+
+    def _open(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+        self.tasks = {}
+        self.next_id = 1
+        self.journal_records = 0
+        self._legacy_snapshot = False
+        self.seq = self._load_snapshot()
+        self._reindex()
+        self._replay(self.rotated_path, 0)
+        self._journal_offset = self._replay(self.journal_path, 0)
+        self._journal = open(self.journal_path, "ab")
+        self._remember_files()
+
+    def _remember_files(self) -> None:
+        self._snapshot_key = _stat_key(self.path)
+        self._journal_key = _stat_key(self.journal_path)
+
+    def _refresh(self) -> None:
+        """Serves the in-memory tasks while the files on disk are unchanged, catching up otherwise."""
+        snapshot_key = _stat_key(self.path)
+        journal_key = _stat_key(self.journal_path)
+        if snapshot_key == self._snapshot_key and journal_key == self._journal_key:
+            self.hits += 1
+            return
+        self.misses += 1
+        if snapshot_key != self._snapshot_key:
+            # A compaction elsewhere only folds in records we have already
+            # applied; anything newer (e.g. a replace) needs a full reload.
+            snapshot_seq = self._peek_snapshot_seq()
+            if snapshot_seq is None or snapshot_seq > self.seq:
+                self._open()
+                return
+            self._snapshot_key = snapshot_key
+        if journal_key != self._journal_key and not self._follow_journal(journal_key):
+            self._open()
+
+    def _follow_journal(self, journal_key) -> bool:
+        """Replays records other processes appended, across a rotation if one happened."""
+        if journal_key is None or self._journal_key is None:
+            return False
+        if journal_key[2] == self._journal_key[2]:
+            offset = self._replay(self.journal_path, self._journal_offset, follow=True)
+        else:
+            # Another process rotated the journal we were reading: finish it
+            # as <snapshot>.journal.1, then start on the new one.
+            rotated_key = _stat_key(self.rotated_path)
+            if rotated_key is None or rotated_key[2] != self._journal_key[2]:
+                return False
+            if self._replay(self.rotated_path, self._journal_offset, follow=True) is None:
+                return False
+            offset = self._replay(self.journal_path, 0, follow=True)
+            self._journal.close()
+            self._journal = open(self.journal_path, "ab")
+        if offset is None:
+            return False
+        self._journal_offset = offset
+        self._journal_key = journal_key
+        return True
+
+    def _peek_snapshot_seq(self):
+        try:
+            with open(self.path, "rb") as file:
+                head = file.read(128)
+        except FileNotFoundError:
+            return 0
+        try:
+            return detect_serializer(head).peek_seq(head)
+        except ValueError:
+            return None
+
+    def _load_snapshot(self) -> int:
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "rb") as file:
+            raw = file.read()
+        data = detect_serializer(raw[:128]).load(raw)
+        if isinstance(data, list):
+            # Legacy tasks.json: a bare list written by the old save_tasks.
+            # It is rewritten in snapshot form by the first mutation.
+            self._legacy_snapshot = True
+            self._set_tasks(data)
+            return 0
+        self._set_tasks(data["tasks"])
+        self.next_id = max(self.next_id, data.get("next_id", 1))
+        return data["seq"]
+
+    def _set_tasks(self, tasks: list) -> None:
+        self.tasks = {task["id"]: task for task in tasks}
+        self.next_id = max(self.next_id, max(self.tasks, default=0) + 1)
+
+    def _replay(self, journal_path: str, offset: int, follow: bool = False):
+        """Applies records from offset on and returns the offset after the last whole record.
+
+        When following, any gap in seq numbers or unreadable line means this
+        is not the history we were reading, and None is returned instead.
+        """
+        if not os.path.exists(journal_path):
+            return None if follow else 0
+        with open(journal_path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break  # torn tail, cut off by the next writer
+                try:
+                    record = json.loads(line)
+                    seq = record["seq"]
+                except (ValueError, TypeError, KeyError):
+                    if follow:
+                        return None
+                    break
+                offset += len(line)
+                if seq <= self.seq:
+                    continue
+                if follow and seq != self.seq + 1:
+                    return None
+                self._apply(record)
+                self.seq = seq
+                self.journal_records += _record_weight(record)
+        return offset
+
+    def _reindex(self) -> None:
+        self._due_index = sorted((_ensure_due_ordinal(task), task["id"]) for task in self.tasks.values())
+        self._category_index = {}
+        for key in self._due_index:
+            self._category_index.setdefault(self.tasks[key[1]]["category"], []).append(key)
+
+    def _apply(self, record: dict) -> None:
+        op = record["op"]
+        if op == "add":
+            task = record["task"]
+            self.tasks[task["id"]] = task
+            self.next_id = max(self.next_id, task["id"] + 1)
+            key = (_ensure_due_ordinal(task), task["id"])
+            bisect.insort(self._due_index, key)
+            bisect.insort(self._category_index.setdefault(task["category"], []), key)
+        elif op == "add_many":
+            # One sort per index instead of an insort per task; timsort merges
+            # the already-sorted index with the new run in linear time.
+            touched = set()
+            for task in record["tasks"]:
+                self.tasks[task["id"]] = task
+                key = (_ensure_due_ordinal(task), task["id"])
+                self._due_index.append(key)
+                self._category_index.setdefault(task["category"], []).append(key)
+                touched.add(task["category"])
+            if record["tasks"]:
+                self.next_id = max(self.next_id, record["tasks"][-1]["id"] + 1)
+            self._due_index.sort()
+            for category in touched:
+                self._category_index[category].sort()
+        elif op == "delete":
+            task = self.tasks.pop(record["id"], None)
+            if task is None:
+                return
+            key = (task["due_ordinal"], task["id"])
+            _remove_key(self._due_index, key)
+            category_index = self._category_index[task["category"]]
+            _remove_key(category_index, key)
+            if not category_index:
+                del self._category_index[task["category"]]
+        elif op == "clear":
+            self.tasks = {}
+            self._due_index = []
+            self._category_index = {}
+        else:
+            raise ValueError(f"Unknown journal op: {op}")
+
+    # ---------- Mutations ----------
+
+    def _prepare_write(self) -> None:
+        # Runs under the exclusive lock before a mutation looks at the state.
+        self._drop_torn_tail()
+        if self._legacy_snapshot:
+            self._write_snapshot(list(self.tasks.values()), self.seq, self.next_id)
+            self._legacy_snapshot = False
+            self._remember_files()
+
+    def _append(self, record: dict) -> None:
+        # Callers hold the exclusive lock and have already refreshed, so
+        # self.seq is the newest seq in the journal and our record follows it.
+        self.seq += 1
+        record["seq"] = self.seq
+        self._apply(record)
+        self._journal.write(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+        self._journal.flush()
+        self._journal_offset = self._journal.tell()
+        self._remember_files()
+        self.journal_records += _record_weight(record)
+        if self.journal_records >= self.compact_threshold:
+            self._start_compaction()
+
+    def _drop_torn_tail(self) -> None:
+        # Bytes past our offset can only be half a record from a writer that
+        # died; whole records there would mean our view is stale.
+        if os.fstat(self._journal.fileno()).st_size == self._journal_offset:
+            return
+        with open(self.journal_path, "rb") as file:
+            file.seek(self._journal_offset)
+            tail = file.read()
+        if b"\n" in tail:
+            self._open()
+            if os.fstat(self._journal.fileno()).st_size == self._journal_offset:
+                return
+            with open(self.journal_path, "rb") as file:
+                file.seek(self._journal_offset)
+                if b"\n" in file.read():
+                    raise ValueError(f"Unreadable record in {self.journal_path} at offset {self._journal_offset}")
+        self._journal.truncate(self._journal_offset)
+
+    def count(self) -> int:
+        with self._locked(exclusive=False):
+            return len(self.tasks)
+
+    def load(self) -> list:
+        with self._locked(exclusive=False):
+            return list(self.tasks.values())
+
+    def load_versioned(self) -> tuple:
+        with self._locked(exclusive=False):
+            return list(self.tasks.values()), self.seq
+
+    def version(self) -> int:
+        with self._locked(exclusive=False):
+            return self.seq
+
+    def iter_tasks(self, category=None, due_after=None, due_before=None, offset=0, limit=None):
+        with self._locked(exclusive=False):
+            index = self._due_index if category is None else self._category_index.get(category, [])
+            start = 0 if due_after is None else bisect.bisect_right(index, (due_after, float("inf")))
+            stop = len(index) if due_before is None else bisect.bisect_left(index, (due_before,))
+            start += offset
+            if limit is not None:
+                stop = min(stop, start + limit)
+            # Copy the page: the index shifts if tasks are added or removed while iterating
+            ids = [task_id for _, task_id in index[start:stop]]
+        for task_id in ids:
+            task = self.tasks.get(task_id)
+            if task is not None:
+                yield task
+
+    def cache_stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def add(self, task: dict) -> dict:
+        with self._locked(exclusive=True):
+            task = _with_id(task, self.next_id)
+            self._append({"op": "add", "task": task})
+            return task
+
+    def add_many(self, tasks: list) -> list:
+        # A single journal record, so a crash mid-write drops the whole batch
+        # rather than leaving part of it behind.
+        with self._locked(exclusive=True):
+            tasks = [_with_id(task, self.next_id + i) for i, task in enumerate(tasks)]
+            self._append({"op": "add_many", "tasks": tasks})
+            return tasks
+
+    def delete(self, task_id: int) -> bool:
+        with self._locked(exclusive=True):
+            if task_id not in self.tasks:
+                return False
+            self._append({"op": "delete", "id": task_id})
+            return True
+
+    def clear(self) -> None:
+        with self._locked(exclusive=True):
+            self._append({"op": "clear"})
+
+    def replace(self, tasks: list, expected_version: int = None) -> None:
+        """Replaces the whole task list with a fresh snapshot and an empty journal."""
+        self._join_compactor()
+        # Wait out any compaction, here or in another process, so it cannot
+        # install an older snapshot over this one afterwards.
+        compact_lock = _FileLock(self.compact_lock_path)
+        try:
+            with compact_lock.hold(), self._locked(exclusive=True):
+                if expected_version is not None and expected_version != self.seq:
+                    raise VersionConflict(f"{self.path} is at version {self.seq}, expected {expected_version}")
+                self._set_tasks(list(tasks))
+                self._reindex()
+                self.seq += 1
+                self._write_snapshot(list(self.tasks.values()), self.seq, self.next_id)
+                self._legacy_snapshot = False
+                self._journal.close()
+                for journal in (self.rotated_path, self.journal_path):
+                    if os.path.exists(journal):
+                        os.remove(journal)
+                self._journal = open(self.journal_path, "ab")
+                self._journal_offset = 0
+                self.journal_records = 0
+                self._remember_files()
+        finally:
+            compact_lock.close()
+
+    # ---------- Compaction ----------
+
+    def compact(self, wait: bool = True) -> None:
+        """Folds the journal into a fresh snapshot, in a background thread unless wait is set."""
+        with self._locked(exclusive=True):
+            self._start_compaction()
+        if wait:
+            self._join_compactor()
+
+    def _start_compaction(self) -> None:
+        # Caller holds the exclusive lock. Skips quietly if a compaction is
+        # already running in this or another process.
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        compact_lock = _FileLock(self.compact_lock_path)
+        if not compact_lock.acquire(blocking=False):
+            compact_lock.close()
+            return
+        self._journal.close()
+        if os.path.exists(self.rotated_path):
+            # A previous compaction died before finishing; its records are
+            # already in memory, so the new snapshot below covers them too.
+            with open(self.rotated_path, "ab") as rotated, open(self.journal_path, "rb") as current:
+                rotated.write(current.read())
+            os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self.rotated_path)
+        self._journal = open(self.journal_path, "ab")
+        self._journal_offset = 0
+        self._remember_files()
+        self.journal_records = 0
+        # Tasks are never mutated in place, so a shallow copy is a stable view.
+        args = (list(self.tasks.values()), self.seq, self.next_id, compact_lock)
+        self._compactor = threading.Thread(target=self._finish_compaction, args=args)
+        self._compactor.start()
+
+    def _finish_compaction(self, tasks: list, seq: int, next_id: int, compact_lock: _FileLock) -> None:
+        # Runs without self._lock, which close() and replace() hold while
+        # joining this thread. Its own lock file handle conflicts with the
+        # main one like another process would.
+        try:
+            tmp_path = self._write_snapshot_tmp(tasks, seq, next_id)
+            file_lock = _FileLock(self.lock_path)
+            try:
+                with file_lock.hold(exclusive=True):
+                    os.replace(tmp_path, self.path)
+                    os.remove(self.rotated_path)
+                    snapshot_key = _stat_key(self.path)
+            finally:
+                file_lock.close()
+            # A stale key here only costs one extra reload.
+            self._snapshot_key = snapshot_key
+        finally:
+            compact_lock.close()
+
+    def _join_compactor(self) -> None:
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def _write_snapshot_tmp(self, tasks: list, seq: int, next_id: int) -> str:
+        tmp_path = f"{self.path}.tmp.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "wb") as file:
+            self.serializer.dump({"seq": seq, "next_id": next_id, "tasks": tasks}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        return tmp_path
+
+    def _write_snapshot(self, tasks: list, seq: int, next_id: int) -> None:
+        os.replace(self._write_snapshot_tmp(tasks, seq, next_id), self.path)
+
+    def close(self) -> None:
+        self._join_compactor()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            self._file_lock.close()
+
+
+# Journal records counted toward COMPACT_THRESHOLD: one per task for batches
+def _record_weight(record: dict) -> int:
+    return len(record["tasks"]) if record["op"] == "add_many" else 1
+
+# Copy of a task with its id set by the store, listed first
+def _with_id(task: dict, task_id: int) -> dict:
+    return {"id": task_id, **{key: value for key, value in task.items() if key != "id"}}
+
+# Remove one key from a sorted index by bisection
+def _remove_key(index: list, key: tuple) -> None:
+    position = bisect.bisect_left(index, key)
+    if position < len(index) and index[position] == key:
+        del index[position]
+
+# (mtime, size, inode) of a file, or None when it does not exist
+def _stat_key(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+# SQLite task store.
+#
+# Tasks live in one table keyed by id (the rowid, so lookups by id are a
+# B-tree search) with secondary indexes on due_date and category. Inserting
+# or deleting a single task touches only that row and its index entries.
+# New ids come from a counter in the meta table, so they are never reused.
+# Writes run in BEGIN IMMEDIATE transactions and bump a version counter next
+# to it; WAL mode lets readers in other processes carry on meanwhile.
+class SQLiteStore(TaskStore):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            due_date TEXT NOT NULL,
+            category TEXT NOT NULL,
+            due_ordinal INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+    INDEXES = """
+        CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+        CREATE INDEX IF NOT EXISTS tasks_due_ordinal ON tasks (due_ordinal);
+        CREATE INDEX IF NOT EXISTS tasks_category_due ON tasks (category, due_ordinal);
+        DROP INDEX IF EXISTS tasks_category;
+    """
+    COLUMNS = "id, description, due_date, category, due_ordinal"
+    BUSY_TIMEOUT = 30  # seconds to wait for another writer
+
+    def __init__(self, path: str):
+        self.path = path
+        # Autocommit mode; transactions are opened explicitly in _write().
+        self._conn = sqlite3.connect(path, timeout=self.BUSY_TIMEOUT, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        self._migrate()
+        self._conn.executescript(self.INDEXES)
+
+    @contextmanager
+    def _write(self, bump_version: bool = True):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            if bump_version:
+                self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _migrate(self) -> None:
+        with self._write(bump_version=False):
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) "
+                "SELECT 'next_id', COALESCE(MAX(id), 0) + 1 FROM tasks"
+            )
+            self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)")
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+            if "due_ordinal" in columns:
+                return
+            # Databases imported before due dates were pre-parsed.
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN due_ordinal INTEGER NOT NULL DEFAULT 0")
+            rows = self._conn.execute("SELECT id, due_date FROM tasks").fetchall()
+            self._conn.executemany(
+                "UPDATE tasks SET due_ordinal = ? WHERE id = ?",
+                ((_ensure_due_ordinal(dict(row)), row["id"]) for row in rows),
+            )
+
+    def _meta(self, key: str) -> int:
+        return self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()[0]
+
+    @staticmethod
+    def _row(task: dict) -> tuple:
+        return (task["id"], task["description"], task["due_date"], task["category"], _ensure_due_ordinal(task))
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def load(self) -> list:
+        rows = self._conn.execute(f"SELECT {self.COLUMNS} FROM tasks ORDER BY id")
+        return [dict(row) for row in rows]
+
+    def load_versioned(self) -> tuple:
+        self._conn.execute("BEGIN")
+        try:
+            return self.load(), self._meta("version")
+        finally:
+            self._conn.execute("COMMIT")
+
+    def version(self) -> int:
+        return self._meta("version")
+
+    def iter_tasks(self, category=None, due_after=None, due_before=None, offset=0, limit=None):
+        clauses, params = [], []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if due_after is not None:
+            clauses.append("due_ordinal > ?")
+            params.append(due_after)
+        if due_before is not None:
+            clauses.append("due_ordinal < ?")
+            params.append(due_before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params += [-1 if limit is None else limit, offset]
+        rows = self._conn.execute(
+            f"SELECT {self.COLUMNS} FROM tasks {where} ORDER BY due_ordinal, id LIMIT ? OFFSET ?", params
+        )
+        for row in rows:
+            yield dict(row)
+
+    def add(self, task: dict) -> dict:
+        return self.add_many([task])[0]
+
+    def add_many(self, tasks: list) -> list:
+        with self._write():
+            next_id = self._meta("next_id")
+            tasks = [_with_id(task, next_id + i) for i, task in enumerate(tasks)]
+            self._conn.executemany(
+                f"INSERT INTO tasks ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                (self._row(task) for task in tasks),
+            )
+            self._conn.execute("UPDATE meta SET value = ? WHERE key = 'next_id'", (next_id + len(tasks),))
+        return tasks
+
+    def delete(self, task_id: int) -> bool:
+        with self._write():
+            return self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount > 0
+
+    def clear(self) -> None:
+        with self._write():
+            self._conn.execute("DELETE FROM tasks")
+
+    def replace(self, tasks: list, expected_version: int = None) -> None:
+        with self._write():
+            version = self._meta("version")
+            if expected_version is not None and expected_version != version:
+                raise VersionConflict(f"{self.path} is at version {version}, expected {expected_version}")
+            self._conn.execute("DELETE FROM tasks")
+            self._conn.executemany(
+                f"INSERT INTO tasks ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+                (self._row(task) for task in tasks),
+            )
+            self._conn.execute(
+                "UPDATE meta SET value = MAX(value, (SELECT COALESCE(MAX(id), 0) + 1 FROM tasks)) "
+                "WHERE key = 'next_id'"
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+BACKENDS = {
+    "json": JournalStore,
+    "sqlite": SQLiteStore,
+}
+
+_stores: dict[tuple, TaskStore] = {}
+
+# Backend named by $TASK_STORE_BACKEND, "json" when unset
+def default_backend() -> str:
+    backend = os.environ.get(BACKEND_ENV, DEFAULT_BACKEND)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown task store backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    return backend
+
+# Get the shared store for a tasks file, opening it on first use
+def get_store(path: str, backend: str = None) -> TaskStore:
+    backend = backend or default_backend()
+    store = _stores.get((backend, path))
+    if store is None:
+        store = _stores[(backend, path)] = BACKENDS[backend](path)
+    return store
+
+# Cache hit/miss counters summed over every open store
+def cache_stats() -> dict:
+    totals = {"hits": 0, "misses": 0}
+    for store in _stores.values():
+        for key, value in store.cache_stats().items():
+            totals[key] += value
+    return totals
+
+# One-shot copy of a JSON task store into a SQLite database
+def import_json(json_path: str, db_path: str) -> int:
+    source = JournalStore(json_path)
+    target = SQLiteStore(db_path)
+    try:
+        tasks = source.load()
+        target.replace(tasks)
+    finally:
+        source.close()
+        target.close()
+    return len(tasks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Task store maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import-json", help="copy tasks.json into a SQLite database")
+    import_parser.add_argument("json_path", nargs="?", default="tasks.json")
+    import_parser.add_argument("db_path", nargs="?", default="tasks.db")
+    args = parser.parse_args()
+
+    if args.command == "import-json":
+        imported = import_json(args.json_path, args.db_path)
+        print(f"[+] Imported {imported} tasks from {args.json_path} into {args.db_path}")
+
+
+if __name__ == "__main__":
+    main()
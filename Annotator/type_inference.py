@@ -0,0 +1,105 @@
+from itertools import islice
+from typing import Any
+
+# Containers nested deeper than this are named without their element types.
+MAX_DEPTH = 3
+# Elements looked at per container: an evenly spaced sample for lists, the first
+# ones for dicts. Together with MAX_DEPTH this bounds the work for any value.
+MAX_ITEMS = 10
+
+def merge_types(types: list[str]) -> str:
+    types = list(set(types))
+    if len(types) == 1:
+        return types[0]
+    return f"Union[{', '.join(sorted(types))}]"
+
+class TypeInferer:
+    """Names the runtime type of a value, in righttyper's notation by default.
+
+    Subclasses change the notation by overriding leaf_type, container_kind and
+    merge. Names of non-container values depend only on their type and are
+    cached per type; a container is looked at once per call however often it is
+    shared, and one that contains itself is named Any where it recurs.
+    """
+
+    list_name = "list"
+    dict_name = "dict"
+
+    def __init__(self, max_depth: int = MAX_DEPTH, max_items: int = MAX_ITEMS):
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self._leaf_types: dict[type, str] = {}
+
+    def __call__(self, value: Any) -> str:
+        name = self._leaf_types.get(type(value))
+        if name is not None:
+            return name
+        return self._infer(value, 0, {})
+
+    def leaf_type(self, value: Any) -> str:
+        if value is None:
+            return "None"
+        elif isinstance(value, bool):
+            return "bool"
+        elif isinstance(value, int):
+            return "int"
+        elif isinstance(value, float):
+            return "float"
+        elif isinstance(value, str):
+            return "str"
+        return "Any"
+
+    def container_kind(self, value: Any):
+        if isinstance(value, list):
+            return list
+        elif isinstance(value, dict):
+            return dict
+        return None
+
+    def merge(self, types: set[str]) -> str:
+        if len(types) == 1:
+            return next(iter(types))
+        return f"Union[{', '.join(sorted(types))}]"
+
+    def _infer(self, value: Any, depth: int, seen: dict[int, Any]) -> str:
+        leaf_types = self._leaf_types
+        value_type = type(value)
+        name = leaf_types.get(value_type)
+        if name is not None:
+            return name
+
+        kind = self.container_kind(value)
+        if kind is None:
+            name = leaf_types[value_type] = self.leaf_type(value)
+            return name
+
+        key = id(value)
+        if key in seen:
+            # None marks a container still being inferred further up: a cycle.
+            return seen[key] or "Any"
+        if not value or depth >= self.max_depth:
+            return self.empty_name(kind)
+
+        seen[key] = None
+        depth += 1
+        infer = self._infer
+        if kind is list:
+            if len(value) > self.max_items:
+                value = value[::len(value) // self.max_items][:self.max_items]
+            inner = {leaf_types.get(type(v)) or infer(v, depth, seen) for v in value}
+            name = f"{self.list_name}[{self.merge(inner)}]"
+        else:
+            if len(value) > self.max_items:
+                keys, values = zip(*islice(value.items(), self.max_items))
+            else:
+                keys, values = value.keys(), value.values()
+            key_types = {leaf_types.get(type(k)) or infer(k, depth, seen) for k in keys}
+            value_types = {leaf_types.get(type(v)) or infer(v, depth, seen) for v in values}
+            name = f"{self.dict_name}[{self.merge(key_types)}, {self.merge(value_types)}]"
+        seen[key] = name
+        return name
+
+    def empty_name(self, kind: type) -> str:
+        if kind is list:
+            return f"{self.list_name}[Any]"
+        return f"{self.dict_name}[Any, Any]"
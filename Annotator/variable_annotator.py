@@ -1,12 +1,23 @@
 import ast
-import sys
 import os
 import csv
+import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import ast_cache
+import generate_csv
+
+# Passes over a module, or over modules that import each other, before their
+# return types are taken as settled.
+MAX_PASSES = 10
 
 class VariableTypeInferer(ast.NodeVisitor):
     def __init__(self):
         self.variable_types = {}       # mapping: (filename, function or 'global', variable) -> type string
         self.function_returns = {}     # mapping: function name -> inferred return type
+        self.defined_returns = {}      # mapping: function defined in the analyzed file -> return type
+        self.returns_seen = set()      # (function name, return type or None) as looked up
         self.current_function = None
         self.current_function_return_types = []
         self.current_scope = 'global'
@@ -27,10 +38,12 @@ class VariableTypeInferer(ast.NodeVisitor):
     def visit_FunctionDef(self, node):
         self.current_function = node.name
         self.current_scope = node.name
+        unannotated = [arg.arg for arg in node.args.args if not self.get_annotation_type(arg.annotation)]
+        use_sites = self.collect_use_sites(node.body, unannotated) if unannotated else {}
         for arg in node.args.args:
             inferred = self.get_annotation_type(arg.annotation)
             if not inferred:
-                inferred = self.infer_type_from_usage(node.body, arg.arg)
+                inferred = self.infer_type_from_use_sites(use_sites[arg.arg], arg.arg)
             if not inferred:
                 inferred = "function_param"
             self.variable_types[(self.filename, node.name, arg.arg)] = inferred
@@ -41,6 +54,7 @@ class VariableTypeInferer(ast.NodeVisitor):
         if self.current_function_return_types:
             preferred = next((t for t in self.current_function_return_types if t in ("dict", "list")), self.current_function_return_types[0])
             self.function_returns[node.name] = preferred
+            self.defined_returns[node.name] = preferred
         self.current_function = None
         self.current_scope = 'global'
         self.current_function_return_types = []
@@ -109,6 +123,7 @@ class VariableTypeInferer(ast.NodeVisitor):
         if isinstance(value, ast.Dict): return "dict"
         if isinstance(value, ast.Call):
             func_name = self.get_func_name(value.func)
+            self.returns_seen.add((func_name, self.function_returns.get(func_name)))
             if func_name in self.function_returns:
                 return self.function_returns[func_name]
             if func_name in ("input",): return "str"
@@ -129,13 +144,33 @@ class VariableTypeInferer(ast.NodeVisitor):
         return self.variable_types.get((self.filename, self.current_scope, var_name), "Unknown")
 
     def infer_type_from_usage(self, body, var_name):
+        return self.infer_type_from_use_sites(self.collect_use_sites(body, [var_name])[var_name], var_name)
+
+    def collect_use_sites(self, body, names):
+        """Indexes the statements infer_type_from_use_sites looks at, for all names in one walk of body."""
+        use_sites = {name: [] for name in names}
         for stmt in ast.walk(ast.Module(body=body)):
+            if isinstance(stmt, ast.Assign):
+                used = [stmt.value, stmt.targets[0]]
+            elif isinstance(stmt, ast.Call):
+                used = stmt.args
+            else:
+                continue
+            for node in used:
+                if isinstance(node, ast.Name) and node.id in use_sites:
+                    sites = use_sites[node.id]
+                    if not sites or sites[-1] is not stmt:
+                        sites.append(stmt)
+        return use_sites
+
+    def infer_type_from_use_sites(self, use_sites, var_name):
+        for stmt in use_sites:
             if isinstance(stmt, ast.Assign):
                 if isinstance(stmt.value, ast.Name) and stmt.value.id == var_name:
                     return self.get_type_by_name(var_name)
                 if isinstance(stmt.targets[0], ast.Name) and stmt.targets[0].id == var_name:
                     return self.infer_type(stmt.value)
-            elif isinstance(stmt, ast.Call):
+            else:
                 for arg in stmt.args:
                     if isinstance(arg, ast.Name) and arg.id == var_name:
                         inferred = self.infer_type(arg)
@@ -145,33 +180,294 @@ class VariableTypeInferer(ast.NodeVisitor):
 
     def analyze_file(self, filename):
         self.filename = filename
-        with open(filename, "r") as f:
-            source = f.read()
-        tree = ast.parse(source, filename=filename)
+        tree = ast_cache.parse_file(filename)
         self.visit(tree)
 
 
+REPORT = "variable_annotation_report.txt"
+
+
 def write_report(variable_types):
-    with open("variable_annotation_report.txt", "w", newline="") as f:
+    entries = [[fname, func, var, vartype] for (fname, func, var), vartype in sorted(variable_types.items())]
+    with open(REPORT, "w", newline="") as f:
         writer = csv.writer(f)
         writer.writerow(["Filename", "Function", "Variable Name", "Inferred Type"])
-        for (fname, func, var), vartype in sorted(variable_types.items()):
-            writer.writerow([fname, func, var, vartype])
+        writer.writerows(entries)
+    generate_csv.write_records(generate_csv.records_path(REPORT), generate_csv.variable_rows(entries))
 
 
-def main():
-    files = sys.argv[1:]
-    inferer = VariableTypeInferer()
-    for file in files:
-        if not os.path.isfile(file):
-            print(f"[ERROR] File not found: {file}")
+def infer_module(filename, known_returns=None, inferer_class=VariableTypeInferer):
+    """Analyzes filename with the return types of imported functions known.
+
+    A function called before its definition is resolved on a further pass,
+    seeded with the return types the previous pass found, until they settle.
+    Returns the inferer of the last pass.
+    """
+    own_returns = {}
+    for _ in range(MAX_PASSES):
+        inferer = inferer_class()
+        inferer.function_returns.update(known_returns or {})
+        inferer.function_returns.update(own_returns)
+        inferer.analyze_file(filename)
+        defined = inferer.defined_returns
+        # Done unless a call was resolved before (or without) its function's final return type
+        if not any(name in defined and defined[name] != seen for name, seen in inferer.returns_seen):
+            break
+        own_returns = defined
+    return inferer
+
+
+def analyze_file_fragment(filename, known_returns=None):
+    """Analyzes one file; the result is picklable and merged by merge_fragments."""
+    inferer = infer_module(filename, known_returns)
+    return {"variable_types": inferer.variable_types, "function_returns": inferer.defined_returns}
+
+
+def merge_fragments(fragments):
+    """Merges per-file fragments in the order given, so the result does not depend on scheduling."""
+    variable_types = {}
+    function_returns = {}
+    for fragment in fragments:
+        variable_types.update(fragment["variable_types"])
+        function_returns.update(fragment["function_returns"])
+    return variable_types, function_returns
+
+
+def analyze_files(files, jobs=None):
+    """Analyzes files in dependency order (see analyze_modules) and merges the results."""
+    return merge_fragments(analyze_modules(files, analyze_file_fragment, jobs))
+
+
+# ---------- Cross-module return types ----------
+
+def resolve_import(filename, module, level, known_files):
+    """Path of the analyzed file that `import module` in filename refers to, or None.
+
+    Relative imports are resolved against filename's package. Absolute ones are
+    looked up next to filename and then in each directory above it, as if the
+    script's directory or a project root were on sys.path.
+    """
+    parts = module.split(".") if module else []
+    base = os.path.dirname(os.path.abspath(filename))
+    if level:
+        for _ in range(level - 1):
+            base = os.path.dirname(base)
+        bases = [base]
+    else:
+        bases = [base]
+        while os.path.dirname(base) != base:
+            base = os.path.dirname(base)
+            bases.append(base)
+    for base in bases:
+        stem = os.path.join(base, *parts)
+        for candidate in (stem + ".py", os.path.join(stem, "__init__.py")):
+            if candidate in known_files:
+                return known_files[candidate]
+    return None
+
+
+def import_statements(body):
+    """Import statements in body and the blocks nested in it, in source order.
+
+    Imports are statements, so expressions are not searched.
+    """
+    stack = list(reversed(body))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            yield node
             continue
-        inferer.analyze_file(file)
+        children = []
+        for field in ("body", "handlers", "orelse", "finalbody", "cases"):
+            block = getattr(node, field, None)
+            if isinstance(block, list):
+                children.extend(block)
+        stack.extend(reversed(children))
+
+
+def module_imports(filename, known_files):
+    """What filename imports from the other analyzed files: [(file, bindings)].
+
+    bindings maps local names to the imported function names, or is None when
+    every function is visible under its own name (`import m`, since calls are
+    matched by attribute name, and `from m import *`).
+    """
+    imports = []
+    for node in import_statements(ast_cache.parse_file(filename).body):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                target = resolve_import(filename, alias.name, 0, known_files)
+                if target is not None:
+                    imports.append((target, None))
+        elif isinstance(node, ast.ImportFrom):
+            target = resolve_import(filename, node.module, node.level, known_files)
+            bindings = {}
+            for alias in node.names:
+                if alias.name == "*":
+                    bindings = None
+                    break
+                # `from package import module` imports the module, like `import package.module`
+                submodule = f"{node.module}.{alias.name}" if node.module else alias.name
+                submodule = resolve_import(filename, submodule, node.level, known_files)
+                if submodule is not None:
+                    imports.append((submodule, None))
+                else:
+                    bindings[alias.asname or alias.name] = alias.name
+            if target is not None and bindings != {}:
+                imports.append((target, bindings))
+    return [(target, bindings) for target, bindings in imports if target != filename]
+
+
+def import_cycles(files, graph):
+    """Strongly connected components of the import graph, each after the ones it imports from."""
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in files:
+        if root in index:
+            continue
+        # Iterative Tarjan: import chains can be longer than the recursion limit
+        work = [(root, iter(graph[root]))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, edges = work[-1]
+            for dep in edges:
+                if dep not in index:
+                    index[dep] = lowlink[dep] = len(index)
+                    stack.append(dep)
+                    on_stack.add(dep)
+                    work.append((dep, iter(graph[dep])))
+                    break
+                elif dep in on_stack:
+                    lowlink[node] = min(lowlink[node], index[dep])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def analyze_modules(files, analyze=analyze_file_fragment, jobs=None):
+    """Analyzes files so calls to functions of other analyzed modules get their return types.
+
+    Modules are analyzed after the modules they import from, a level of the
+    import graph at a time (in a process pool unless jobs is 1). Modules that
+    import each other are analyzed again while the return types they import
+    still change, up to MAX_PASSES times. analyze(file, known_returns) returns
+    a fragment whose "function_returns" are the file's own functions' return
+    types. Returns the fragments in the order of files.
+    """
+    files = list(dict.fromkeys(files))
+    known_files = {os.path.abspath(f): f for f in files}
+    workers = min(jobs or os.cpu_count() or 1, len(files))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+
+    def run(function, items, *args):
+        if executor is None:
+            return map(function, items, *args)
+        # Several files per task: small modules would otherwise cost more to ship than to analyze
+        chunksize = max(1, len(items) // (workers * 4))
+        return executor.map(function, items, *args, chunksize=chunksize)
+
+    try:
+        # Finding the imports parses every file, so it runs in the pool as well
+        imports = dict(zip(files, run(module_imports, files, repeat(known_files))))
+        graph = {f: [target for target, _ in imports[f]] for f in files}
+
+        level = {}
+        cyclic = set()
+        for component in import_cycles(files, graph):
+            members = set(component)
+            if len(component) > 1:
+                cyclic.update(component)
+            deps = [level[dep] for f in component for dep in graph[f] if dep not in members]
+            for f in component:
+                level[f] = max(deps, default=-1) + 1
+        levels = [[] for _ in range(max(level.values(), default=-1) + 1)]
+        for f in files:
+            levels[level[f]].append(f)
+
+        exports = {}
+        fragments = {}
+        def known_returns(f):
+            known = {}
+            for target, bindings in imports[f]:
+                returns = exports.get(target, {})
+                if bindings is None:
+                    known.update(returns)
+                else:
+                    known.update((local, returns[name]) for local, name in bindings.items() if name in returns)
+            return known
+
+        for modules in levels:
+            passes = dict.fromkeys(modules, 0)
+            used = {}
+            pending = modules
+            while pending:
+                knowns = [known_returns(f) for f in pending]
+                for f, known, fragment in zip(pending, knowns, run(analyze, pending, knowns)):
+                    used[f] = known
+                    passes[f] += 1
+                    fragments[f] = fragment
+                    exports[f] = fragment["function_returns"]
+                # Only modules whose imported return types changed are analyzed again
+                pending = [f for f in modules
+                           if f in cyclic and passes[f] < MAX_PASSES and known_returns(f) != used[f]]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return [fragments[f] for f in files]
+
+
+def expand_paths(paths):
+    """Expands directories (to the .py files under them) and glob patterns, in sorted order."""
+    files = []
+    for path in paths:
+        if glob.has_magic(path):
+            matches = sorted(glob.glob(path, recursive=True))
+        else:
+            matches = [path]
+        if not matches:
+            print(f"[ERROR] File not found: {path}")
+        for match in matches:
+            if os.path.isdir(match):
+                for root, dirs, names in os.walk(match):
+                    dirs.sort()
+                    files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(".py"))
+            elif os.path.isfile(match):
+                files.append(match)
+            else:
+                print(f"[ERROR] File not found: {match}")
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Infer variable types from Python source files.")
+    parser.add_argument("paths", nargs="+", help="Files, directories or glob patterns (e.g. 'src/**/*.py')")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Worker processes (default: CPU count, 1 analyzes in this process)")
+    options = parser.parse_args()
+
+    variable_types, _ = analyze_files(expand_paths(options.paths), options.jobs)
 
-    for (fname, func, var), vartype in inferer.variable_types.items():
+    for (fname, func, var), vartype in variable_types.items():
         print(f"[DEBUG] {fname} | {func} | {var} -> {vartype}")
 
-    write_report(inferer.variable_types)
+    write_report(variable_types)
 
 
 if __name__ == "__main__":